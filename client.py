@@ -25,19 +25,27 @@ Proyecto: Simulador de Scheduling de CPU
 Materia: Sistemas Operativos - UABC 2025
 """
 
+import contextlib
 import socket
-import threading
+import selectors
 import pygame
 import random
 import sys
 import time
 from typing import Optional, List
 
-from config import SERVER_HOST, SERVER_PORT, BUFFER_SIZE, MSG_TYPES, DEFAULT_QUANTUM
-from protocol import Message, Protocol, MessageBuffer
+from config import SERVER_HOST, SERVER_PORT, BUFFER_SIZE, MSG_TYPES, DEFAULT_QUANTUM, FPS, NET_POLL_MS
+from protocol import Message, Protocol, MessageBuffer, peek_type
 from visualization import Renderer
 
 
+# Evento de PyGame generado por timer para leer el socket
+NET_POLL_EVENT = pygame.USEREVENT + 1
+
+# Teclas que cierran el cliente
+_QUIT_KEYS = frozenset((pygame.K_q, pygame.K_ESCAPE))
+
+
 class SchedulingClient:
     """
     Cliente grafico para el simulador de scheduling.
@@ -81,10 +89,29 @@ class SchedulingClient:
             'statistics': {},
             'context_switches': 0
         }
-        self.state_lock = threading.Lock()
+        # El cliente corre en un solo thread (socket non-blocking), asi que
+        # el estado no necesita un lock real; si se agrega un thread
+        # receptor, reemplazar por threading.Lock()
+        self.state_lock = contextlib.nullcontext()
+        
+        # Ultima version de estado dibujada (ver SchedulerManager.version)
+        self._last_rendered_version = -1
         
-        # Buffer para parsear mensajes del stream TCP
+        # Version del servidor con la que esta al dia el Gantt local; un
+        # delta del Gantt solo se aplica si su base_version no es mayor
+        self._gantt_version = -1
+        
+        # Buffer para parsear mensajes del stream TCP, y buffer fijo en el
+        # que recv_into() escribe cada lectura sin crear un bytes nuevo
         self.buffer = MessageBuffer()
+        self._recv_buf = bytearray(BUFFER_SIZE)
+        self._recv_view = memoryview(self._recv_buf)
+        
+        # Mensajes salientes acumulados hasta el siguiente flush
+        self._send_buf = bytearray()
+        
+        # Selector para consultar si hay datos sin lanzar excepciones
+        self._sel = selectors.DefaultSelector()
         
         # Componente de rendering
         self.renderer: Optional[Renderer] = None
@@ -100,6 +127,25 @@ class SchedulingClient:
             "Nginx", "Apache", "Java", "Rust", "Go"
         ]
         self._next_name_idx = 0
+        
+        # Tabla tecla -> accion para handle_input (Q/ESC se tratan aparte)
+        self._key_handlers = {
+            pygame.K_1: lambda: self._select_algorithm('FCFS'),
+            pygame.K_2: lambda: self._select_algorithm('SJF'),
+            pygame.K_3: lambda: self._select_algorithm('PRIORITY'),
+            pygame.K_4: lambda: self._select_algorithm('RR'),
+            pygame.K_SPACE: self._toggle_simulation,
+            pygame.K_r: lambda: self.send_message(Protocol.reset_simulation()),
+            pygame.K_a: self.add_random_process,
+            pygame.K_PLUS: lambda: self._adjust_quantum(1),
+            pygame.K_EQUALS: lambda: self._adjust_quantum(1),
+            pygame.K_MINUS: lambda: self._adjust_quantum(-1),
+        }
+        
+        # Pool de valores aleatorios (burst, prioridad) generados en lote
+        # con un generador propio, en lugar de dos randint() por proceso
+        self._rng = random.Random()
+        self._random_pool = iter(())
     
     def connect(self) -> bool:
         """
@@ -114,6 +160,7 @@ class SchedulingClient:
             
             # Non-blocking permite polling en el game loop
             self.socket.setblocking(False)
+            self._sel.register(self.socket, selectors.EVENT_READ)
             self.connected = True
             print(f"[+] Conectado al servidor {self.host}:{self.port}")
             return True
@@ -127,6 +174,8 @@ class SchedulingClient:
             try:
                 # Notificar al servidor
                 self.send_message(Protocol.disconnect())
+                self._flush_send()
+                self._sel.unregister(self.socket)
                 self.socket.close()
             except:
                 pass
@@ -135,43 +184,80 @@ class SchedulingClient:
     
     def send_message(self, msg: Message):
         """
-        Envia un mensaje al servidor.
+        Encola un mensaje para el servidor.
+        
+        El mensaje se acumula en un buffer local y se envia en el
+        siguiente _flush_send(), de modo que varios mensajes generados
+        por una misma tecla (ej: ALGO + QUANTUM) salen en un solo envio.
         
         Args:
             msg: Mensaje a enviar (se serializa a JSON)
         """
         if self.socket and self.connected:
-            try:
-                self.socket.send(msg.to_bytes())
-            except socket.error as e:
-                print(f"[!] Error enviando mensaje: {e}")
-                self.connected = False
+            self._send_buf += msg.to_bytes()
     
-    def receive_messages(self) -> List[Message]:
+    def _flush_send(self):
         """
-        Recibe mensajes pendientes del servidor (non-blocking).
+        Envia al servidor todos los mensajes pendientes en un solo sendall.
         
-        El socket esta en modo non-blocking, asi que retorna
-        inmediatamente si no hay datos disponibles.
+        En Linux se activa TCP_CORK durante el envio para que el kernel
+        empaquete el lote en el menor numero de segmentos posible.
+        """
+        if not self._send_buf or not (self.socket and self.connected):
+            return
+        
+        cork = getattr(socket, 'TCP_CORK', None)
+        try:
+            if cork is not None:
+                self.socket.setsockopt(socket.IPPROTO_TCP, cork, 1)
+            self.socket.sendall(self._send_buf)
+            if cork is not None:
+                self.socket.setsockopt(socket.IPPROTO_TCP, cork, 0)
+        except socket.error as e:
+            print(f"[!] Error enviando mensaje: {e}")
+            self.connected = False
+        finally:
+            self._send_buf.clear()
+    
+    def receive_frames(self) -> List[bytes]:
+        """
+        Recibe frames pendientes del servidor (non-blocking).
+        
+        Primero consulta al selector si el socket tiene datos; solo
+        entonces se llama a recv(), repitiendo hasta vaciar el buffer
+        del kernel. Asi el caso comun (sin datos) no lanza excepciones
+        en cada frame del game loop. Los frames se retornan crudos para
+        que el llamador decida cuales deserializar.
         
         Returns:
-            Lista de mensajes recibidos (puede estar vacia)
+            Lista de frames JSON recibidos (puede estar vacia)
         """
-        messages = []
-        if self.socket and self.connected:
+        if not (self.socket and self.connected):
+            return []
+        if not self._sel.select(timeout=0):
+            # No hay datos disponibles
+            return []
+        
+        # Cada lectura se agrega al MessageBuffer directo desde _recv_buf
+        frames = []
+        recv_into = self.socket.recv_into
+        view = self._recv_view
+        while True:
             try:
-                data = self.socket.recv(BUFFER_SIZE)
-                if data:
-                    messages = self.buffer.add_data(data)
-                elif data == b'':
-                    # Conexion cerrada por el servidor
-                    self.connected = False
+                n = recv_into(self._recv_buf)
             except BlockingIOError:
-                # No hay datos disponibles
-                pass
+                # Buffer del kernel vaciado
+                break
             except socket.error:
                 self.connected = False
-        return messages
+                break
+            if not n:
+                # Conexion cerrada por el servidor
+                self.connected = False
+                break
+            frames += self.buffer.add_frames(view[:n])
+        
+        return frames
     
     def process_server_messages(self):
         """
@@ -183,16 +269,97 @@ class SchedulingClient:
         - Lista de procesos
         - Gantt chart
         - Estadisticas
+        
+        Un STATE_UPDATE puede ser un snapshot completo o un delta
+        (gantt_from/processes_delta) encadenado por base_version con el
+        anterior. Si llegan varios en la misma lectura se aplican todos en
+        orden, desde el ultimo snapshot completo: los anteriores a el no
+        aportan nada, pero saltarse un delta obligaria a pedir GET_STATE.
         """
-        messages = self.receive_messages()
+        updates = []
         
-        for msg in messages:
-            if msg.type == MSG_TYPES['STATE_UPDATE']:
-                with self.state_lock:
-                    self.state = msg.data
-            elif msg.type == MSG_TYPES['DISCONNECT']:
+        for frame in self.receive_frames():
+            msg_type = peek_type(frame)
+            if msg_type == MSG_TYPES['STATE_UPDATE']:
+                msg = Message.from_bytes(frame)
+                if msg.type != MSG_TYPES['STATE_UPDATE']:
+                    continue
+                if msg.data.get('gantt_from') is None:
+                    # Snapshot completo: reemplaza todo lo anterior
+                    updates.clear()
+                updates.append(msg.data)
+            elif msg_type == MSG_TYPES['DISCONNECT']:
                 self.connected = False
                 print("[!] Servidor desconectado")
+        
+        if updates:
+            with self.state_lock:
+                for data in updates:
+                    self._apply_state(data)
+    
+    def _apply_state(self, new_state: dict):
+        """
+        Aplica un STATE_UPDATE sobre self.state reutilizando sus contenedores.
+        
+        En lugar de reemplazar el dict completo en cada actualizacion, se
+        actualizan en el lugar el dict de estado, la lista de procesos (y
+        el dict de cada proceso) y la lista del Gantt. Las referencias que
+        guarda el renderer siguen siendo validas y se generan menos objetos
+        de vida corta por actualizacion.
+        
+        Si el servidor envio los procesos como deltas (processes_delta) se
+        combinan con los dicts existentes; si la lista local no corresponde
+        a la misma roster_version se descarta el delta y se pide un estado
+        completo. Igual con el Gantt: si viene como delta (gantt_from) se
+        reemplazan solo las entradas desde gantt_from, siempre que el Gantt
+        local este al dia con base_version.
+        
+        Args:
+            new_state: Estado recibido del servidor
+        """
+        processes = self.state.get('processes')
+        gantt = self.state.get('gantt_chart')
+        roster = self.state.get('roster_version')
+        self.state.update(new_state)
+        resync = False
+        
+        new_processes = self.state.get('processes')
+        if new_state.get('processes_delta'):
+            if (isinstance(processes, list) and roster == new_state.get('roster_version')
+                    and len(processes) == len(new_processes)):
+                for old, new in zip(processes, new_processes):
+                    old.update(new)
+            else:
+                self.state['roster_version'] = roster
+                resync = True
+            self.state['processes'] = processes if processes is not None else []
+        elif isinstance(processes, list) and isinstance(new_processes, list):
+            n = len(new_processes)
+            for old, new in zip(processes, new_processes):
+                old.update(new)
+            del processes[n:]
+            processes.extend(new_processes[len(processes):])
+            self.state['processes'] = processes
+        
+        new_gantt = self.state.get('gantt_chart')
+        gantt_from = new_state.get('gantt_from')
+        if gantt_from is not None:
+            if (isinstance(gantt, list) and len(gantt) >= gantt_from
+                    and self._gantt_version >= new_state.get('base_version', 0)):
+                del gantt[gantt_from:]
+                gantt.extend(new_gantt)
+                self._gantt_version = new_state.get('version', -1)
+            else:
+                resync = True
+            self.state['gantt_chart'] = gantt if gantt is not None else []
+        else:
+            if isinstance(gantt, list) and isinstance(new_gantt, list):
+                gantt[:] = new_gantt
+                self.state['gantt_chart'] = gantt
+            self._gantt_version = new_state.get('version', -1)
+        
+        if resync:
+            self.send_message(Protocol.get_state())
     
     def add_random_process(self):
         """
@@ -207,12 +374,40 @@ class SchedulingClient:
         name = self._process_names[self._next_name_idx % len(self._process_names)]
         self._next_name_idx += 1
         
-        burst = random.randint(2, 12)
+        burst, priority = self._next_random_values()
         arrival = self.state.get('current_time', 0)
-        priority = random.randint(1, 10)
         
         self.send_message(Protocol.add_process(name, burst, arrival, priority))
     
+    def _next_random_values(self) -> tuple:
+        """Retorna (burst, prioridad) del pool, rellenandolo si se agoto."""
+        try:
+            return next(self._random_pool)
+        except StopIteration:
+            self._random_pool = zip(self._rng.choices(range(2, 13), k=1024),
+                                    self._rng.choices(range(1, 11), k=1024))
+            return next(self._random_pool)
+    
+    def _select_algorithm(self, name: str):
+        """Cambia el algoritmo; RR tambien envia el quantum local."""
+        self.send_message(Protocol.set_algorithm(name))
+        if name == 'RR':
+            self.send_message(Protocol.set_quantum(self.quantum))
+    
+    def _toggle_simulation(self):
+        """Inicia la simulacion o la pausa si ya esta corriendo."""
+        if not self.state.get('is_running'):
+            self.send_message(Protocol.start_simulation())
+        else:
+            self.send_message(Protocol.pause_simulation())
+    
+    def _adjust_quantum(self, delta: int):
+        """Ajusta el quantum local dentro de [1, 10] y lo envia al servidor."""
+        self.quantum = max(1, min(10, self.quantum + delta))
+        self.send_message(Protocol.set_quantum(self.quantum))
+        if self.renderer:
+            self.renderer.quantum = self.quantum
+    
     def handle_input(self, event: pygame.event.Event) -> bool:
         """
         Procesa un evento de entrada del usuario.
@@ -235,59 +430,33 @@ class SchedulingClient:
             return False
         
         if event.type == pygame.KEYDOWN:
-            # Seleccion de algoritmo
-            if event.key == pygame.K_1:
-                self.send_message(Protocol.set_algorithm('FCFS'))
-            elif event.key == pygame.K_2:
-                self.send_message(Protocol.set_algorithm('SJF'))
-            elif event.key == pygame.K_3:
-                self.send_message(Protocol.set_algorithm('PRIORITY'))
-            elif event.key == pygame.K_4:
-                self.send_message(Protocol.set_algorithm('RR'))
-                self.send_message(Protocol.set_quantum(self.quantum))
-            
-            # Control de simulacion
-            elif event.key == pygame.K_SPACE:
-                if not self.state.get('is_running'):
-                    self.send_message(Protocol.start_simulation())
-                else:
-                    self.send_message(Protocol.pause_simulation())
-            
-            elif event.key == pygame.K_r:
-                self.send_message(Protocol.reset_simulation())
-            
-            elif event.key == pygame.K_a:
-                self.add_random_process()
-            
-            # Ajuste de quantum
-            elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
-                self.quantum = min(10, self.quantum + 1)
-                self.send_message(Protocol.set_quantum(self.quantum))
-                if self.renderer:
-                    self.renderer.quantum = self.quantum
-            
-            elif event.key == pygame.K_MINUS:
-                self.quantum = max(1, self.quantum - 1)
-                self.send_message(Protocol.set_quantum(self.quantum))
-                if self.renderer:
-                    self.renderer.quantum = self.quantum
-            
-            # Salir
-            elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+            if event.key in _QUIT_KEYS:
                 return False
+            handler = self._key_handlers.get(event.key)
+            if handler is not None:
+                handler()
         
         return True
     
+    def _needs_render(self) -> bool:
+        """True si el estado actual aun no se ha dibujado."""
+        with self.state_lock:
+            version = self.state.get('version')
+        return version is None or version != self._last_rendered_version
+    
     def run(self):
         """
         Loop principal del cliente.
         
         1. Conectar al servidor
         2. Inicializar renderer PyGame
-        3. Game loop:
-           a. Recibir mensajes del servidor
-           b. Procesar input del usuario
-           c. Renderizar frame
+        3. Game loop con un unico punto de espera (pygame.event.wait):
+           a. Si hay un estado nuevo y llego el deadline del frame:
+              renderizar (a lo mas FPS veces por segundo)
+           b. NET_POLL_EVENT (timer cada NET_POLL_MS): recibir mensajes
+              del servidor
+           c. QUIT/KEYDOWN: procesar input del usuario
+           d. WINDOWEXPOSED: redibujar aunque el estado no cambie
         4. Cleanup al salir
         """
         if not self.connect():
@@ -312,24 +481,48 @@ class SchedulingClient:
 ========================================================
         """)
         
+        frame_period = 1.0 / FPS
+        next_frame = time.monotonic()
+        
+        # El renderer solo deja pasar QUIT/KEYDOWN; habilitar tambien el
+        # evento del timer de red y el de ventana expuesta
+        pygame.event.set_allowed([NET_POLL_EVENT, pygame.WINDOWEXPOSED])
+        pygame.time.set_timer(NET_POLL_EVENT, NET_POLL_MS)
+        self.process_server_messages()
+        
         try:
             while self.running and self.connected:
-                # 1. Recibir actualizaciones del servidor
-                self.process_server_messages()
+                # 1. Renderizar solo si el estado cambio desde el ultimo
+                #    frame; sin nada que dibujar la espera no tiene limite
+                #    (timeout 0) y la despierta el input o el timer de red
+                timeout_ms = 0
+                if self._needs_render():
+                    now = time.monotonic()
+                    if now >= next_frame:
+                        next_frame = max(next_frame + frame_period, now)
+                        with self.state_lock:
+                            self.renderer.render(self.state)
+                            self._last_rendered_version = self.state.get('version')
+                    else:
+                        # +1 para no despertar antes del deadline
+                        timeout_ms = int((next_frame - now) * 1000) + 1
                 
-                # 2. Procesar eventos de usuario
-                for event in self.renderer.get_events():
-                    if not self.handle_input(event):
+                # 2. Esperar input, timer de red o el siguiente frame
+                for event in self.renderer.wait_events(timeout_ms):
+                    if event.type == NET_POLL_EVENT:
+                        self.process_server_messages()
+                    elif event.type == pygame.WINDOWEXPOSED:
+                        # La ventana perdio su contenido: forzar redibujo
+                        self._last_rendered_version = -1
+                    elif not self.handle_input(event):
                         self.running = False
                         break
-                
-                # 3. Renderizar frame actual
-                with self.state_lock:
-                    self.renderer.render(self.state)
+                self._flush_send()
                 
         except KeyboardInterrupt:
             print("\n[*] Interrupcion recibida")
         finally:
+            pygame.time.set_timer(NET_POLL_EVENT, 0)
             self.disconnect()
             if self.renderer:
                 self.renderer.quit()
@@ -17,7 +17,11 @@ Materia: Sistemas Operativos - UABC 2025
 SERVER_HOST = 'localhost'   # Direccion del servidor
 SERVER_PORT = 5555          # Puerto TCP para conexiones
 MAX_CLIENTS = 10            # Maximo de clientes simultaneos
-BUFFER_SIZE = 4096          # Tamano del buffer de recepcion en bytes
+BUFFER_SIZE = 65536         # Tamano del buffer de recepcion en bytes
+MAX_FRAME_SIZE = 65536      # Tamano maximo de un mensaje de cliente en bytes
+SOCKET_BUFFER_SIZE = 262144 # SO_SNDBUF/SO_RCVBUF de los sockets de clientes
+KEEPALIVE_IDLE = 10         # Segundos sin trafico antes de sondear un cliente
+LOG_QUEUE_SIZE = 1024       # Mensajes de log pendientes antes de descartar
 
 # ==============================================================================
 # CONFIGURACION DE LA SIMULACION
@@ -34,6 +38,9 @@ MAX_PROCESSES = 20          # Limite de procesos en el sistema
 WINDOW_WIDTH = 1200         # Ancho de ventana en pixeles
 WINDOW_HEIGHT = 800         # Alto de ventana en pixeles
 FPS = 60                    # Frames por segundo
+NET_POLL_MS = 33            # Periodo de lectura del socket en el cliente (ms)
+TEXT_CACHE_SIZE = 512       # Textos rasterizados que guarda el renderer
+TICK_LABELS = 1000          # Etiquetas de tiempo del Gantt pre-renderizadas
 
 # ==============================================================================
 # PALETA DE COLORES (RGB)
@@ -86,6 +93,7 @@ PROCESS_COLORS = [
 ALGORITHMS = {
     'FCFS': 'First Come First Served',
     'SJF': 'Shortest Job First',
+    'SRTF': 'Shortest Remaining Time First',
     'PRIORITY': 'Priority Scheduling',
     'RR': 'Round Robin'
 }
@@ -14,12 +14,16 @@ Proyecto: Simulador de Scheduling de CPU
 Materia: Sistemas Operativos - UABC 2025
 """
 
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import Optional
+from enum import IntEnum
+from heapq import heappop, heappush
+from itertools import count
+from operator import attrgetter
+from typing import Callable, Optional
 
 
-class ProcessState(Enum):
+class ProcessState(IntEnum):
     """
     Estados posibles de un proceso en el sistema.
     
@@ -28,15 +32,27 @@ class ProcessState(Enum):
     RUNNING:   Actualmente ejecutandose en CPU
     WAITING:   Bloqueado esperando I/O (no usado en esta simulacion)
     COMPLETED: Termino su ejecucion
+    
+    Es IntEnum para que comparaciones y hashing (indices por estado)
+    usen las operaciones nativas de int. Hacia los clientes el estado
+    se transmite por nombre ("READY", "RUNNING", ...).
     """
-    NEW = "NEW"
-    READY = "READY"
-    RUNNING = "RUNNING"
-    WAITING = "WAITING"
-    COMPLETED = "COMPLETED"
+    NEW = 0
+    READY = 1
+    RUNNING = 2
+    WAITING = 3
+    COMPLETED = 4
+
+
+# Nombre de cada estado indexado por su valor (para serializacion)
+_STATE_NAMES = tuple(state.name for state in ProcessState)
+
+# Alias de modulo para las comparaciones en cada transicion de estado
+_READY = ProcessState.READY
+_RUNNING = ProcessState.RUNNING
 
 
-@dataclass
+@dataclass(slots=True)
 class Process:
     """
     Representa un proceso en el simulador de scheduling.
@@ -65,7 +81,7 @@ class Process:
     arrival_time: int = 0
     priority: int = 5
     remaining_time: int = field(init=False)
-    state: ProcessState = ProcessState.NEW
+    _state: ProcessState = field(default=ProcessState.NEW, init=False, repr=False)
     start_time: Optional[int] = None
     completion_time: Optional[int] = None
     waiting_time: int = 0
@@ -73,11 +89,34 @@ class Process:
     response_time: Optional[int] = None
     color_index: int = 0
     execution_history: list = field(default_factory=list)
+    _queue: Optional['ProcessQueue'] = field(default=None, init=False, repr=False, compare=False)
+    _static: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _ready_since: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _delta_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _dict_source: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Inicializa remaining_time igual a burst_time al crear el proceso."""
         self.remaining_time = self.burst_time
     
+    @property
+    def state(self) -> ProcessState:
+        """Estado actual del proceso."""
+        return self._state
+    
+    @state.setter
+    def state(self, new_state: ProcessState):
+        """
+        Cambia el estado y notifica a la cola que contiene al proceso,
+        para que mantenga actualizados sus indices por estado.
+        """
+        old_state = self._state
+        self._state = new_state
+        self._delta_cache = None
+        if self._queue is not None and old_state != new_state:
+            self._queue._on_state_change(self, old_state, new_state)
+    
     def execute(self, time_units: int, current_time: int) -> int:
         """
         Ejecuta el proceso por un numero de unidades de tiempo.
@@ -105,15 +144,14 @@ class Process:
             self.response_time = current_time - self.arrival_time
         
         # Ejecutar el minimo entre lo solicitado y lo que queda
+        self._delta_cache = None
         actual_execution = min(time_units, self.remaining_time)
         self.remaining_time -= actual_execution
         
         # Registrar en historial para el diagrama de Gantt
-        self.execution_history.append({
-            'start': current_time,
-            'end': current_time + actual_execution,
-            'duration': actual_execution
-        })
+        # Cada entrada es una tupla (start, end, duration)
+        self.execution_history.append(
+            (current_time, current_time + actual_execution, actual_execution))
         
         # Verificar si el proceso termino
         if self.remaining_time <= 0:
@@ -140,10 +178,25 @@ class Process:
         
         Waiting Time = Turnaround Time - Burst Time
         Es decir, el tiempo que paso en estado READY esperando CPU.
+        
+        El tiempo ejecutado (la suma de duraciones del historial) es
+        burst_time - remaining_time, asi que no se recorre el historial.
         """
         if self.completion_time is not None:
-            total_execution = sum(h['duration'] for h in self.execution_history)
+            total_execution = self.burst_time - self.remaining_time
             self.waiting_time = self.turnaround_time - total_execution
+            self._delta_cache = None
+    
+    def current_waiting_time(self) -> int:
+        """
+        Tiempo de espera acumulado hasta el reloj de la cola.
+        
+        Mientras el proceso esta en READY la espera no se incrementa tick
+        a tick: la cola registra desde cuando espera y aqui se suma.
+        """
+        if self._ready_since is None or self._queue is None:
+            return self.waiting_time
+        return self.waiting_time + self._queue.clock - self._ready_since
     
     def reset(self):
         """Reinicia el proceso a su estado inicial para re-simular."""
@@ -155,28 +208,71 @@ class Process:
         self.turnaround_time = 0
         self.response_time = None
         self.execution_history = []
+        self._delta_cache = None
     
     def to_dict(self) -> dict:
         """
         Serializa el proceso a diccionario para transmision por socket.
         El servidor usa esto para enviar el estado a los clientes.
+        
+        Los campos que no cambian una vez que el proceso entra al sistema
+        (pid, nombre, burst, llegada, prioridad, color) se arman una sola
+        vez y se reutilizan; el resto se obtiene de to_delta_dict(). Si
+        ese dict no cambio, se retorna el mismo resultado de la vez
+        anterior (los consumidores no deben modificarlo).
+        """
+        delta = self.to_delta_dict()
+        if self._dict_source is delta:
+            return self._dict_cache
+        if self._static is None:
+            self._static = {
+                'pid': self.pid,
+                'name': self.name,
+                'burst_time': self.burst_time,
+                'arrival_time': self.arrival_time,
+                'priority': self.priority,
+                'color_index': self.color_index
+            }
+        data = self._static.copy()
+        data.update(delta)
+        self._dict_cache = data
+        self._dict_source = delta
+        return data
+    
+    def to_delta_dict(self) -> dict:
         """
-        return {
-            'pid': self.pid,
-            'name': self.name,
-            'burst_time': self.burst_time,
-            'arrival_time': self.arrival_time,
-            'priority': self.priority,
+        Serializa solo los campos que cambian durante la simulacion.
+        
+        Un cliente que ya recibio el snapshot completo del proceso
+        (to_dict) puede combinar este dict con el que ya tiene.
+        
+        El dict se guarda y se reutiliza hasta que el proceso cambia
+        (execute, cambio de estado, reset), asi que los procesos sin
+        cambios no se vuelven a serializar. Si solo avanzo su tiempo de
+        espera se copia el dict anterior con ese campo actualizado.
+        """
+        waiting_time = self.current_waiting_time()
+        cache = self._delta_cache
+        if cache is not None:
+            if cache['waiting_time'] == waiting_time:
+                return cache
+            # Cualquier otro cambio descarta el cache, asi que solo avanzo
+            # la espera (proceso en READY): copiar y ajustar ese campo
+            cache = cache.copy()
+            cache['waiting_time'] = waiting_time
+            self._delta_cache = cache
+            return cache
+        self._delta_cache = cache = {
             'remaining_time': self.remaining_time,
-            'state': self.state.value,
+            'state': _STATE_NAMES[self.state],
             'start_time': self.start_time,
             'completion_time': self.completion_time,
-            'waiting_time': self.waiting_time,
+            'waiting_time': waiting_time,
             'turnaround_time': self.turnaround_time,
             'response_time': self.response_time,
-            'color_index': self.color_index,
             'execution_history': self.execution_history
         }
+        return cache
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Process':
@@ -190,22 +286,27 @@ class Process:
             color_index=data.get('color_index', 0)
         )
         process.remaining_time = data.get('remaining_time', process.burst_time)
-        process.state = ProcessState(data.get('state', 'NEW'))
+        process.state = ProcessState[data.get('state', 'NEW')]
         process.start_time = data.get('start_time')
         process.completion_time = data.get('completion_time')
         process.waiting_time = data.get('waiting_time', 0)
         process.turnaround_time = data.get('turnaround_time', 0)
         process.response_time = data.get('response_time')
-        process.execution_history = data.get('execution_history', [])
+        process.execution_history = [tuple(h) for h in data.get('execution_history', [])]
         return process
     
     def __str__(self):
-        return f"Process({self.pid}, {self.name}, burst={self.burst_time}, state={self.state.value})"
+        return f"Process({self.pid}, {self.name}, burst={self.burst_time}, state={_STATE_NAMES[self.state]})"
     
     def __repr__(self):
         return self.__str__()
 
 
+# Orden de admision: por llegada, desempatando por PID
+_ARRIVAL_KEY = attrgetter('arrival_time', 'pid')
+_ARRIVAL_TIME = attrgetter('arrival_time')
+
+
 class ProcessQueue:
     """
     Cola de procesos con operaciones para scheduling.
@@ -213,22 +314,205 @@ class ProcessQueue:
     Mantiene la lista de todos los procesos en el sistema y provee
     metodos para filtrarlos por estado, lo cual es necesario para
     los algoritmos de scheduling.
+    
+    Ademas de la lista, mantiene un indice por estado que se actualiza
+    en cada transicion, de modo que las consultas por estado no recorren
+    todos los procesos en cada tick. El indice usa id(proceso) como llave
+    porque el PID puede repetirse tras un RESET del servidor.
+    
+    Para la admision (NEW -> READY) se mantiene ademas una lista ordenada
+    por arrival_time y un puntero a la primera llegada aun no admitida:
+    como el reloj solo avanza, cada tick revisa unicamente las llegadas
+    nuevas en lugar de todos los procesos. Los procesos READY tambien se
+    guardan ordenados por llegada (se insertan en orden al entrar a READY),
+    asi que get_ready_processes entrega la cola ya ordenada sin ordenarla.
+    
+    El tiempo de espera tampoco se incrementa tick a tick: al entrar a READY
+    se guarda el valor de clock y al salir se suma lo transcurrido (ver
+    Process.current_waiting_time). El SchedulerManager mantiene clock igual
+    a su current_time.
+    
+    Si se configura una llave de orden (set_ready_key), los procesos READY
+    tambien se mantienen en un min-heap por esa llave, y pop_ready()
+    obtiene el siguiente a ejecutar en O(log n) sin ordenar la cola. Las
+    entradas obsoletas (procesos que dejaron READY) se descartan al llegar
+    a la cima del heap.
     """
     
     def __init__(self):
         self.processes: list[Process] = []
+        self._by_state: dict[ProcessState, dict[int, Process]] = {
+            state: {} for state in ProcessState
+        }
+        self._by_arrival: list[Process] = []
+        self._admitted = 0
+        self._ready_by_arrival: list[Process] = []
+        self.clock = 0
+        
+        # Heap de READY: entradas (llave, secuencia, proceso). La secuencia
+        # desempata en orden de entrada a READY y _ready_seq guarda la
+        # entrada vigente de cada proceso (id(proceso) -> secuencia)
+        self._ready_key: Optional[Callable[[Process], tuple]] = None
+        self._ready_heap: list[tuple] = []
+        self._ready_seq: dict[int, int] = {}
+        self._seq = count()
     
     def add(self, process: Process):
         """Agrega un proceso al sistema."""
         self.processes.append(process)
+        self._by_state[process.state][id(process)] = process
+        process._queue = self
+        
+        insort(self._by_arrival, process, key=_ARRIVAL_KEY)
+        # Si llego "en el pasado" el puntero retrocede para admitirlo
+        index = bisect_right(self._by_arrival, _ARRIVAL_KEY(process),
+                             key=_ARRIVAL_KEY) - 1
+        if index < self._admitted:
+            self._admitted = index
     
     def remove(self, pid: int) -> Optional[Process]:
         """Remueve y retorna un proceso por su PID."""
         for i, p in enumerate(self.processes):
             if p.pid == pid:
+                del self._by_state[p.state][id(p)]
+                if p.state == ProcessState.READY:
+                    self._discard_ready(p)
+                    p.waiting_time = p.current_waiting_time()
+                    p._ready_since = None
+                    p._delta_cache = None
+                self._ready_seq.pop(id(p), None)
+                p._queue = None
+                index = next(j for j, q in enumerate(self._by_arrival) if q is p)
+                del self._by_arrival[index]
+                if index < self._admitted:
+                    self._admitted -= 1
                 return self.processes.pop(i)
         return None
     
+    def admit(self, current_time: int) -> int:
+        """
+        Transiciona a READY los procesos NEW que ya llegaron.
+        
+        Avanza el puntero de admision sobre la lista ordenada por
+        arrival_time, asi que el costo es proporcional a las llegadas
+        nuevas desde la ultima llamada.
+        
+        Returns:
+            Cantidad de procesos admitidos
+        """
+        arrivals = self._by_arrival
+        i = self._admitted
+        admitted = 0
+        while i < len(arrivals) and arrivals[i].arrival_time <= current_time:
+            if arrivals[i].state == ProcessState.NEW:
+                arrivals[i].state = ProcessState.READY
+                admitted += 1
+            i += 1
+        self._admitted = i
+        return admitted
+    
+    def next_arrival(self) -> Optional[int]:
+        """Retorna el arrival_time de la siguiente llegada no admitida, o None."""
+        if self._admitted < len(self._by_arrival):
+            return self._by_arrival[self._admitted].arrival_time
+        return None
+    
+    def count(self, state: ProcessState) -> int:
+        """Cantidad de procesos en un estado, sin recorrerlos."""
+        return len(self._by_state[state])
+    
+    def _on_state_change(self, process: Process, old_state: ProcessState,
+                         new_state: ProcessState):
+        """Mueve el proceso entre indices cuando cambia de estado."""
+        key = id(process)
+        by_state = self._by_state
+        del by_state[old_state][key]
+        by_state[new_state][key] = process
+        
+        if new_state == _READY:
+            insort(self._ready_by_arrival, process, key=_ARRIVAL_KEY)
+            # Un proceso desalojado empieza a esperar desde el tick siguiente
+            if old_state == _RUNNING:
+                process._ready_since = self.clock + 1
+            else:
+                process._ready_since = self.clock
+            if self._ready_key is not None:
+                self._push_ready(process)
+        elif old_state == _READY:
+            self._discard_ready(process)
+            process.waiting_time += self.clock - process._ready_since
+            process._ready_since = None
+            if self._ready_key is not None:
+                del self._ready_seq[key]
+    
+    def _discard_ready(self, process: Process):
+        """Quita un proceso de la lista READY ordenada por llegada."""
+        ready = self._ready_by_arrival
+        i = bisect_left(ready, _ARRIVAL_KEY(process), key=_ARRIVAL_KEY)
+        while ready[i] is not process:
+            i += 1
+        del ready[i]
+    
+    def _push_ready(self, process: Process):
+        """Agrega la entrada vigente de un proceso READY al heap."""
+        seq = next(self._seq)
+        self._ready_seq[id(process)] = seq
+        heappush(self._ready_heap, (self._ready_key(process), seq, process))
+    
+    def set_ready_key(self, key: Optional[Callable[[Process], tuple]]):
+        """
+        Configura la llave del heap de READY (None lo desactiva).
+        
+        El heap se reconstruye con los procesos READY actuales en su
+        orden de entrada, de modo que los empates se resuelven igual que
+        al recorrer la cola.
+        """
+        self._ready_key = key
+        self._ready_heap = []
+        self._ready_seq = {}
+        if key is not None:
+            for p in self._by_state[ProcessState.READY].values():
+                self._push_ready(p)
+    
+    def pop_ready(self, exclude: Optional[Process] = None) -> Optional[Process]:
+        """
+        Retira y retorna el proceso READY con menor llave (ver set_ready_key).
+        
+        La llave de un proceso no cambia mientras esta en READY (solo
+        remaining_time cambia, y eso ocurre en RUNNING), asi que basta
+        con descartar las entradas que ya no son las vigentes.
+        
+        Args:
+            exclude: Proceso que no debe elegirse (su entrada se conserva),
+                     ej: el que acaba de ser desalojado en este tick
+        """
+        heap = self._ready_heap
+        ready_seq = self._ready_seq
+        skipped = None
+        selected = None
+        while heap:
+            entry = heappop(heap)
+            process = entry[2]
+            if ready_seq.get(id(process)) != entry[1]:
+                continue
+            if process is exclude:
+                skipped = entry
+                continue
+            selected = process
+            break
+        if skipped is not None:
+            heappush(heap, skipped)
+        return selected
+    
+    def peek_ready_key(self) -> Optional[tuple]:
+        """Retorna la llave del minimo del heap de READY sin retirarlo."""
+        heap = self._ready_heap
+        ready_seq = self._ready_seq
+        # Descartar entradas obsoletas que hayan quedado en la cima
+        while heap and ready_seq.get(id(heap[0][2])) != heap[0][1]:
+            heappop(heap)
+        return heap[0][0] if heap else None
+    
     def get_ready_processes(self, current_time: int) -> list[Process]:
         """
         Obtiene procesos que pueden ejecutarse en el tiempo actual.
@@ -236,39 +520,76 @@ class ProcessQueue:
         Un proceso esta listo si:
         1. Su arrival_time <= current_time (ya llego)
         2. Esta en estado NEW o READY (no completado ni ejecutando)
+        
+        La lista se entrega ordenada por (arrival_time, pid).
         """
-        return [p for p in self.processes 
-                if p.arrival_time <= current_time 
-                and p.state in (ProcessState.NEW, ProcessState.READY)]
+        ready_all = self._ready_by_arrival
+        if ready_all and ready_all[-1].arrival_time <= current_time:
+            # Caso comun: todos los READY ya llegaron, una sola copia
+            ready = ready_all[:]
+        else:
+            ready = ready_all[:bisect_right(ready_all, current_time, key=_ARRIVAL_TIME)]
+        
+        # Los procesos NEW que ya llegaron estan despues del puntero de
+        # admision (si aun no se llamo a admit para este tiempo)
+        arrivals = self._by_arrival
+        i = self._admitted
+        if i == len(arrivals) or arrivals[i].arrival_time > current_time:
+            return ready
+        end = bisect_right(arrivals, current_time, lo=i, key=_ARRIVAL_TIME)
+        arrived = [p for p in arrivals[i:end] if p.state == ProcessState.NEW]
+        if arrived:
+            # Dos corridas ya ordenadas: sort las mezcla en tiempo lineal
+            ready.extend(arrived)
+            ready.sort(key=_ARRIVAL_KEY)
+        return ready
     
     def get_completed_processes(self) -> list[Process]:
         """Retorna lista de procesos que ya terminaron."""
-        return [p for p in self.processes if p.state == ProcessState.COMPLETED]
+        return list(self._by_state[ProcessState.COMPLETED].values())
     
     def get_running_process(self) -> Optional[Process]:
         """Retorna el proceso actualmente en CPU, o None."""
-        for p in self.processes:
-            if p.state == ProcessState.RUNNING:
-                return p
-        return None
+        return next(iter(self._by_state[ProcessState.RUNNING].values()), None)
     
     def all_completed(self) -> bool:
-        """Verifica si todos los procesos han terminado."""
+        """
+        Verifica si todos los procesos han terminado.
+        
+        El indice de COMPLETED funciona como contador de completados, asi
+        que es una comparacion de enteros y no recorre los procesos.
+        """
         if not self.processes:
             return False
-        return all(p.state == ProcessState.COMPLETED for p in self.processes)
+        return len(self._by_state[ProcessState.COMPLETED]) == len(self.processes)
     
     def reset_all(self):
         """Reinicia todos los procesos a su estado inicial."""
         for p in self.processes:
             p.reset()
+        self._admitted = 0
+        self._ready_by_arrival.clear()
+        self._ready_heap.clear()
     
     def clear(self):
         """Elimina todos los procesos de la cola."""
+        for p in self.processes:
+            p._queue = None
         self.processes.clear()
+        for index in self._by_state.values():
+            index.clear()
+        self._by_arrival.clear()
+        self._admitted = 0
+        self._ready_by_arrival.clear()
+        self._ready_heap.clear()
+        self._ready_seq.clear()
     
     def __len__(self):
         return len(self.processes)
     
+    def __contains__(self, process: Process) -> bool:
+        """Verifica si el proceso esta en la cola, en O(1) via el indice."""
+        return id(process) in self._by_state[process.state]
+    
     def __iter__(self):
         return iter(self.processes)
@@ -14,8 +14,8 @@ la capacidad multicliente del sistema.
 Comandos disponibles:
   add <nombre> <burst> [arrival] [priority] - Agregar proceso
   random / r                                - Proceso aleatorio
-  batch <n>                                 - Agregar n procesos
-  algo <FCFS|SJF|PRIORITY|RR>               - Cambiar algoritmo
+  batch <n> [delay_ms]                      - Agregar n procesos
+  algo <FCFS|SJF|SRTF|PRIORITY|RR>          - Cambiar algoritmo
   quantum <valor>                           - Establecer quantum
   start                                     - Iniciar simulacion
   pause                                     - Pausar/Reanudar
@@ -27,16 +27,41 @@ Proyecto: Simulador de Scheduling de CPU
 Materia: Sistemas Operativos - UABC 2025
 """
 
+import atexit
+import contextlib
+import io
+import itertools
+import json
 import socket
+import threading
 import time
 import random
 import sys
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from config import SERVER_HOST, SERVER_PORT, BUFFER_SIZE
+from config import SERVER_HOST, SERVER_PORT, BUFFER_SIZE, ALGORITHMS
 from protocol import Protocol, MessageBuffer
 
 
+# Rangos de valores para procesos aleatorios (burst 2-15, prioridad 1-10)
+_BURST_RANGE = range(2, 16)
+_PRIORITY_RANGE = range(1, 11)
+
+# Algoritmos que acepta el servidor; se validan localmente para no
+# enviar un ALGO que sera rechazado
+_VALID_ALGOS = frozenset(ALGORITHMS)
+
+# Pool de conexiones abiertas para generadores creados con from_pool():
+# (host, port) -> [(socket, thread lector)]. Evita el handshake TCP cuando
+# un script crea y descarta generadores en secuencia
+_POOL: Dict[Tuple[str, int], List[Tuple[socket.socket, threading.Thread]]] = {}
+_POOL_MAX = 4
+_pool_lock = threading.Lock()
+
+# Segundos que disconnect() espera a que el servidor cierre tras el BYE
+_CLOSE_WAIT = 0.2
+
+
 class ProcessGenerator:
     """
     Cliente CLI para generacion y control de procesos.
@@ -64,6 +89,8 @@ class ProcessGenerator:
         self.host = host
         self.port = port
         self.socket: Optional[socket.socket] = None
+        self._reader: Optional[threading.Thread] = None
+        self._pooled = False
         self.connected = False
         
         # Nombres de servicios comunes para procesos aleatorios
@@ -72,7 +99,42 @@ class ProcessGenerator:
             "Redis", "Elasticsearch", "Kafka", "RabbitMQ", "Jenkins",
             "Docker", "Kubernetes", "Terraform", "Ansible", "Prometheus"
         ]
-        self._idx = 0
+        
+        # Ciclo infinito de (nombre, nombre serializado como string JSON);
+        # la forma serializada se usa en los batch
+        self._name_cycle = itertools.cycle(tuple(
+            (name, json.dumps(name).encode('utf-8')) for name in self._process_names
+        ))
+        
+        # Tabla de comandos: accion -> (tokens minimos, handler)
+        self._commands = {
+            'quit': (1, self._cmd_quit),
+            'exit': (1, self._cmd_quit),
+            'q': (1, self._cmd_quit),
+            'add': (3, self._cmd_add),
+            'random': (1, self._cmd_random),
+            'r': (1, self._cmd_random),
+            'batch': (2, self._cmd_batch),
+            'algo': (2, self._cmd_algo),
+            'quantum': (2, self._cmd_quantum),
+            'start': (1, self._cmd_start),
+            'pause': (1, self._cmd_pause),
+            'reset': (1, self._cmd_reset),
+            'help': (1, self._cmd_help),
+        }
+    
+    @classmethod
+    def from_pool(cls, host: str = SERVER_HOST, port: int = SERVER_PORT) -> 'ProcessGenerator':
+        """
+        Crea un generador que reutiliza conexiones del pool del modulo.
+        
+        connect() toma un socket abierto hacia (host, port) si lo hay, y
+        disconnect() lo devuelve al pool (hasta _POOL_MAX) en lugar de
+        cerrarlo. Para el servidor sigue siendo el mismo cliente.
+        """
+        generator = cls(host, port)
+        generator._pooled = True
+        return generator
     
     def connect(self) -> bool:
         """
@@ -81,9 +143,23 @@ class ProcessGenerator:
         Returns:
             True si la conexion fue exitosa
         """
+        if self._pooled and self._take_pooled():
+            self.connected = True
+            return True
+        
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            # Comandos cortos e interactivos: sin Nagle para no retrasarlos,
+            # y buffers grandes para que un batch se envie en menos pasos
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            # Lectura con buffer propio (makefile) en un thread
+            # aparte; ver _drain_server
+            rfile = self.socket.makefile('rb', buffering=BUFFER_SIZE)
+            self._reader = threading.Thread(target=_drain_server, args=(rfile,), daemon=True)
+            self._reader.start()
             self.connected = True
             print(f"[+] Conectado al servidor {self.host}:{self.port}")
             return True
@@ -91,11 +167,44 @@ class ProcessGenerator:
             print(f"[!] Error: {e}")
             return False
     
+    def _take_pooled(self) -> bool:
+        """Toma una conexion viva del pool; False si no hay ninguna."""
+        with _pool_lock:
+            entries = _POOL.get((self.host, self.port))
+            while entries:
+                sock, reader = entries.pop()
+                # Si el lector termino, el servidor cerro la conexion
+                if reader.is_alive():
+                    self.socket, self._reader = sock, reader
+                    return True
+                sock.close()
+        return False
+    
+    def _release_pooled(self) -> bool:
+        """Devuelve la conexion al pool; False si esta lleno o ya murio."""
+        with _pool_lock:
+            entries = _POOL.setdefault((self.host, self.port), [])
+            if len(entries) >= _POOL_MAX or not self._reader.is_alive():
+                return False
+            entries.append((self.socket, self._reader))
+        return True
+    
     def disconnect(self):
-        """Desconecta del servidor."""
+        """Desconecta del servidor (o devuelve la conexion al pool)."""
+        if self.socket and self.connected and self._pooled and self._release_pooled():
+            self.socket = None
+            self.connected = False
+            return
+        
         if self.socket and self.connected:
             try:
-                self.socket.send(Protocol.disconnect().to_bytes())
+                self.socket.sendall(Protocol.DISCONNECT_BYTES)
+                # Tras el BYE el servidor cierra la conexion; esperar ese
+                # cierre (el lector termina con EOF) deja el TIME_WAIT del
+                # lado del servidor. Si tarda, shutdown despierta al lector
+                self._reader.join(_CLOSE_WAIT)
+                if self._reader.is_alive():
+                    self.socket.shutdown(socket.SHUT_RDWR)
                 self.socket.close()
             except:
                 pass
@@ -114,19 +223,69 @@ class ProcessGenerator:
         if not self.connected:
             return
         
-        msg = Protocol.add_process(name, burst, arrival, priority)
-        self.socket.send(msg.to_bytes())
+        self.socket.send(Protocol.add_process_bytes(name, burst, arrival, priority))
         print(f"[>] Proceso enviado: {name} (burst={burst}, arrival={arrival}, priority={priority})")
     
+    def _next_name(self) -> str:
+        """Retorna el siguiente nombre de la lista (en ciclo)."""
+        return next(self._name_cycle)[0]
+    
     def add_random_process(self):
         """Agrega un proceso con valores aleatorios."""
-        name = self._process_names[self._idx % len(self._process_names)]
-        self._idx += 1
+        name = self._next_name()
         burst = random.randint(2, 15)
         priority = random.randint(1, 10)
         
         self.add_process(name, burst, 0, priority)
     
+    def add_random_batch(self, count: int):
+        """
+        Agrega count procesos aleatorios con un solo envio.
+        
+        Los mensajes se concatenan y se mandan con un unico sendall()
+        en lugar de una llamada a send() por proceso.
+        
+        Args:
+            count: Numero de procesos a generar
+        """
+        if not self.connected:
+            return
+        
+        # Valores aleatorios del lote generados de una vez (dos llamadas a
+        # choices) en lugar de dos randint() por proceso
+        bursts = random.choices(_BURST_RANGE, k=count)
+        priorities = random.choices(_PRIORITY_RANGE, k=count)
+        names = itertools.islice(self._name_cycle, count)
+        
+        # Los mensajes se escriben en un BytesIO (buffer que crece en
+        # tiempo amortizado constante) y se envia su vista sin copiarla
+        payload = io.BytesIO()
+        write = payload.write
+        for (_, name_json), burst, priority in zip(names, bursts, priorities):
+            write(Protocol.add_process_encoded(name_json, burst, 0, priority))
+        
+        with self._corked(), payload.getbuffer() as view:
+            self.socket.sendall(view)
+    
+    @contextlib.contextmanager
+    def _corked(self):
+        """
+        Activa TCP_CORK durante el bloque (solo Linux).
+        
+        El kernel retiene los datos hasta completar segmentos llenos y
+        los libera al salir del bloque, de modo que un envio grande o
+        varios envios seguidos salen en el menor numero de segmentos.
+        """
+        cork = getattr(socket, 'TCP_CORK', None)
+        if cork is None:
+            yield
+            return
+        self.socket.setsockopt(socket.IPPROTO_TCP, cork, 1)
+        try:
+            yield
+        finally:
+            self.socket.setsockopt(socket.IPPROTO_TCP, cork, 0)
+    
     def run_interactive(self):
         """
         Inicia el modo interactivo.
@@ -142,9 +301,12 @@ class ProcessGenerator:
         try:
             while self.connected:
                 try:
-                    cmd = input("\n> ").strip().lower().split()
+                    # Solo la accion es insensible a mayusculas; los
+                    # argumentos (ej: nombre del proceso) se conservan
+                    cmd = input("\n> ").split()
                     if not cmd:
                         continue
+                    cmd[0] = cmd[0].lower()
                     
                     self._process_command(cmd)
                     
@@ -166,72 +328,74 @@ class ProcessGenerator:
         """
         Procesa un comando del usuario.
         
+        Busca la accion en self._commands; si no existe o faltan
+        argumentos se reporta como comando no reconocido.
+        
         Args:
             cmd: Lista de tokens del comando
         """
-        action = cmd[0]
-        
-        # Comandos de salida
-        if action in ('quit', 'exit', 'q'):
-            self.connected = False
+        entry = self._commands.get(cmd[0])
+        if entry is None or len(cmd) < entry[0]:
+            print("[?] Comando no reconocido. Escribe 'help' para ver comandos.")
             return
-        
-        # Agregar proceso manual
-        if action == 'add' and len(cmd) >= 3:
-            name = cmd[1]
-            burst = int(cmd[2])
-            arrival = int(cmd[3]) if len(cmd) > 3 else 0
-            priority = int(cmd[4]) if len(cmd) > 4 else 5
-            self.add_process(name, burst, arrival, priority)
-        
-        # Proceso aleatorio
-        elif action in ('random', 'r'):
-            self.add_random_process()
-        
-        # Lote de procesos
-        elif action == 'batch' and len(cmd) >= 2:
-            count = int(cmd[1])
-            print(f"[*] Agregando {count} procesos...")
-            for i in range(count):
-                self.add_random_process()
-                time.sleep(0.1)
-            print(f"[OK] {count} procesos agregados")
-        
-        # Cambiar algoritmo
-        elif action == 'algo' and len(cmd) >= 2:
-            algo = cmd[1].upper()
-            msg = Protocol.set_algorithm(algo)
-            self.socket.send(msg.to_bytes())
-            print(f"[>] Algoritmo cambiado a: {algo}")
-        
-        # Establecer quantum
-        elif action == 'quantum' and len(cmd) >= 2:
-            q = int(cmd[1])
-            msg = Protocol.set_quantum(q)
-            self.socket.send(msg.to_bytes())
-            print(f"[>] Quantum establecido: {q}")
-        
-        # Control de simulacion
-        elif action == 'start':
-            msg = Protocol.start_simulation()
-            self.socket.send(msg.to_bytes())
-            print("[>] Simulacion iniciada")
-        
-        elif action == 'pause':
-            msg = Protocol.pause_simulation()
-            self.socket.send(msg.to_bytes())
-            print("[>] Pausar/Reanudar enviado")
-        
-        elif action == 'reset':
-            msg = Protocol.reset_simulation()
-            self.socket.send(msg.to_bytes())
-            print("[>] Simulacion reiniciada")
-        
-        elif action == 'help':
-            self._print_help()
-        
+        entry[1](cmd)
+    
+    # --- Handlers de comandos (reciben la lista de tokens) ---
+    
+    def _cmd_quit(self, cmd: list):
+        self.connected = False
+    
+    def _cmd_add(self, cmd: list):
+        name = cmd[1]
+        burst = int(cmd[2])
+        arrival = int(cmd[3]) if len(cmd) > 3 else 0
+        priority = int(cmd[4]) if len(cmd) > 4 else 5
+        self.add_process(name, burst, arrival, priority)
+    
+    def _cmd_random(self, cmd: list):
+        self.add_random_process()
+    
+    def _cmd_batch(self, cmd: list):
+        count = int(cmd[1])
+        # Pausa opcional entre procesos (ej: para ver llegadas escalonadas);
+        # por defecto se envia todo el lote de una vez
+        delay_ms = int(cmd[2]) if len(cmd) > 2 else 0
+        print(f"[*] Agregando {count} procesos...")
+        if delay_ms > 0:
+            for _ in range(count):
+                self.add_random_batch(1)
+                time.sleep(delay_ms / 1000)
         else:
-            print("[?] Comando no reconocido. Escribe 'help' para ver comandos.")
+            self.add_random_batch(count)
+        print(f"[OK] {count} procesos agregados")
+    
+    def _cmd_algo(self, cmd: list):
+        algo = cmd[1].upper()
+        if algo not in _VALID_ALGOS:
+            print(f"[!] Algoritmo invalido: {algo}")
+            return
+        self.socket.send(Protocol.set_algorithm_bytes(algo))
+        print(f"[>] Algoritmo cambiado a: {algo}")
+    
+    def _cmd_quantum(self, cmd: list):
+        q = int(cmd[1])
+        self.socket.send(Protocol.set_quantum_bytes(q))
+        print(f"[>] Quantum establecido: {q}")
+    
+    def _cmd_start(self, cmd: list):
+        self.socket.send(Protocol.START_BYTES)
+        print("[>] Simulacion iniciada")
+    
+    def _cmd_pause(self, cmd: list):
+        self.socket.send(Protocol.PAUSE_BYTES)
+        print("[>] Pausar/Reanudar enviado")
+    
+    def _cmd_reset(self, cmd: list):
+        self.socket.send(Protocol.RESET_BYTES)
+        print("[>] Simulacion reiniciada")
+    
+    def _cmd_help(self, cmd: list):
+        self._print_help()
     
     def _print_help_banner(self):
         """Imprime el banner inicial con comandos disponibles."""
@@ -242,8 +406,8 @@ class ProcessGenerator:
   Comandos:
     add <nombre> <burst> [arrival] [priority]
     random                    - Agregar proceso aleatorio
-    batch <cantidad>          - Agregar varios aleatorios
-    algo <FCFS|SJF|PRIORITY|RR> - Cambiar algoritmo
+    batch <cantidad> [ms]     - Agregar varios aleatorios
+    algo <FCFS|SJF|SRTF|PRIORITY|RR> - Cambiar algoritmo
     quantum <valor>           - Establecer quantum
     start                     - Iniciar simulacion
     pause                     - Pausar/Reanudar
@@ -258,8 +422,8 @@ class ProcessGenerator:
 Comandos disponibles:
   add <nombre> <burst> [arrival] [priority] - Agregar proceso
   random (r)                                - Proceso aleatorio
-  batch <n>                                 - Agregar n procesos
-  algo <FCFS|SJF|PRIORITY|RR>               - Cambiar algoritmo
+  batch <n> [delay_ms]                      - Agregar n procesos
+  algo <FCFS|SJF|SRTF|PRIORITY|RR>          - Cambiar algoritmo
   quantum <valor>                           - Establecer quantum
   start                                     - Iniciar
   pause                                     - Pausar/Reanudar
@@ -268,6 +432,49 @@ Comandos disponibles:
         """)
 
 
+def _drain_server(rfile):
+    """
+    Consume los STATE_UPDATE que el servidor envia tras cada comando.
+    
+    El generador no usa el estado, pero si nadie lee el socket el
+    buffer de recepcion se llena y el servidor queda bloqueado en
+    send() (por ejemplo durante un batch grande). Los bytes se leen
+    del makefile y se descartan sin separar frames.
+    
+    Corre en un thread por conexion (no por generador), de modo que
+    las conexiones del pool se siguen drenando mientras esperan.
+    """
+    try:
+        while rfile.read1(BUFFER_SIZE):
+            pass
+    except (OSError, ValueError):
+        pass
+    finally:
+        rfile.close()
+
+
+def close_pool():
+    """
+    Cierra las conexiones que quedaron en el pool.
+    
+    Envia el BYE a cada socket antes de cerrarlo para que el servidor
+    libere al cliente de inmediato. Se registra con atexit, asi que un
+    script que usa from_pool() no necesita llamarla explicitamente.
+    """
+    with _pool_lock:
+        for conns in _POOL.values():
+            for sock, _reader in conns:
+                try:
+                    sock.sendall(Protocol.DISCONNECT_BYTES)
+                except OSError:
+                    pass
+                sock.close()
+        _POOL.clear()
+
+
+atexit.register(close_pool)
+
+
 def main():
     """Punto de entrada del generador de procesos."""
     generator = ProcessGenerator()
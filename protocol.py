@@ -3,13 +3,14 @@ protocol.py - Protocolo de Comunicacion Cliente-Servidor
 
 Este modulo define el protocolo de mensajes usado para la comunicacion
 entre el servidor y los clientes via sockets TCP. Utiliza JSON como
-formato de serializacion con un delimitador de linea para separar mensajes.
+formato de serializacion y un prefijo de longitud para separar mensajes.
 
 Formato de mensaje:
-    {"type": "MSG_TYPE", "data": {...}, "client_id": "optional"}\n
+    [longitud: uint32 big-endian]{"type":"MSG_TYPE","data":{...},"client_id":null}
 
-El delimitador \n permite manejar mensajes parciales cuando se reciben
-datos fragmentados por el protocolo TCP.
+El prefijo indica cuantos bytes de JSON siguen, lo que permite manejar
+mensajes parciales cuando se reciben datos fragmentados por el protocolo
+TCP sin buscar un delimitador dentro del payload.
 
 Autor: Julian Parra
 Proyecto: Simulador de Scheduling de CPU
@@ -17,8 +18,53 @@ Materia: Sistemas Operativos - UABC 2025
 """
 
 import json
+import re
+import struct
 from typing import Any, Optional
-from config import MSG_TYPES
+from config import MSG_TYPES, ALGORITHMS
+
+# Tipos de mensaje resueltos una vez al importar (evita buscar en MSG_TYPES
+# en cada llamada a las factories)
+_T_ADD = MSG_TYPES['ADD_PROCESS']
+_T_REMOVE = MSG_TYPES['REMOVE_PROCESS']
+_T_START = MSG_TYPES['START_SIM']
+_T_PAUSE = MSG_TYPES['PAUSE_SIM']
+_T_RESET = MSG_TYPES['RESET_SIM']
+_T_ALGORITHM = MSG_TYPES['SET_ALGORITHM']
+_T_QUANTUM = MSG_TYPES['SET_QUANTUM']
+_T_GET_STATE = MSG_TYPES['GET_STATE']
+_T_UPDATE = MSG_TYPES['STATE_UPDATE']
+_T_TICK = MSG_TYPES['TICK']
+_T_ACK = MSG_TYPES['ACK']
+_T_ERROR = MSG_TYPES['ERROR']
+_T_DISCONNECT = MSG_TYPES['DISCONNECT']
+
+# orjson (extension en C) es opcional: si esta instalado se usa para
+# serializar/deserializar, si no se recurre al modulo json estandar
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    _loads = json.loads
+
+# Encabezado de cada frame: longitud del payload JSON en 4 bytes
+_HEADER = struct.Struct('>I')
+HEADER_SIZE = _HEADER.size
+
+
+def _frame(payload: bytes) -> bytes:
+    """Antepone el encabezado de longitud a un payload ya serializado."""
+    return _HEADER.pack(len(payload)) + payload
+
+
+class ProtocolError(Exception):
+    """El stream recibido no respeta el protocolo (ej: frame demasiado grande)."""
 
 
 class Message:
@@ -31,48 +77,181 @@ class Message:
         client_id: Identificador del cliente (opcional)
     """
     
+    __slots__ = ('type', 'data', 'client_id')
+    
     def __init__(self, msg_type: str, data: Any = None, client_id: Optional[str] = None):
         self.type = msg_type
         self.data = data
         self.client_id = client_id
     
-    def to_json(self) -> str:
-        """Serializa el mensaje a string JSON."""
-        return json.dumps({
+    def _to_dict(self) -> dict:
+        return {
             'type': self.type,
             'data': self.data,
             'client_id': self.client_id
-        })
+        }
+    
+    def to_json(self) -> str:
+        """Serializa el mensaje a string JSON."""
+        return _dumps(self._to_dict()).decode('utf-8')
     
     def to_bytes(self) -> bytes:
         """
         Convierte el mensaje a bytes para transmision por socket.
-        Agrega \n como delimitador para separar mensajes consecutivos.
+        Antepone la longitud del JSON para separar mensajes consecutivos.
         """
-        return (self.to_json() + '\n').encode('utf-8')
+        return _frame(_dumps(self._to_dict()))
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'Message':
-        """Deserializa un mensaje desde string JSON."""
+    def from_json(cls, json_str) -> 'Message':
+        """Deserializa un mensaje desde JSON (str o bytes)."""
         try:
-            data = json.loads(json_str)
+            data = _loads(json_str)
             return cls(
                 msg_type=data.get('type', ''),
                 data=data.get('data'),
                 client_id=data.get('client_id')
             )
         except json.JSONDecodeError:
-            return cls(msg_type=MSG_TYPES['ERROR'], data='Invalid JSON')
+            return cls(msg_type=_T_ERROR, data='Invalid JSON')
     
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Message':
-        """Crea un mensaje desde bytes recibidos del socket."""
-        return cls.from_json(data.decode('utf-8').strip())
+        """
+        Crea un mensaje desde el payload de un frame (sin encabezado).
+        
+        Los bytes se pasan directo al parser (orjson y json aceptan bytes
+        en UTF-8 y espacios alrededor), sin decodificar a str primero.
+        Los ADD_PROCESS con la forma exacta de _ADD_TEMPLATE se extraen
+        con _ADD_RE sin pasar por el parser generico.
+        """
+        if data.startswith(_ADD_PREFIX):
+            m = _ADD_RE.fullmatch(data)
+            if m is not None:
+                try:
+                    name = m.group(1).decode('utf-8')
+                    client_id = m.group(5)
+                    if client_id is not None:
+                        client_id = client_id.decode('utf-8')
+                except UnicodeDecodeError:
+                    return cls.from_json(data)
+                return cls(_T_ADD, {
+                    'name': name,
+                    'burst_time': int(m.group(2)),
+                    'arrival_time': int(m.group(3)),
+                    'priority': int(m.group(4))
+                }, client_id)
+        return cls.from_json(data)
     
     def __str__(self):
         return f"Message({self.type}, {self.data})"
 
 
+class _PrebuiltMessage(Message):
+    """
+    Mensaje constante cuya serializacion se calcula una sola vez.
+    
+    Se usa para los mensajes de control con un conjunto finito de
+    valores (algoritmos, quantum 1-10): to_bytes() retorna siempre
+    el mismo buffer ya codificado.
+    """
+    
+    __slots__ = ('_bytes',)
+    
+    def __init__(self, msg_type: str, data: Any = None):
+        super().__init__(msg_type, data)
+        self._bytes = super().to_bytes()
+    
+    def to_bytes(self) -> bytes:
+        return self._bytes
+
+
+# Plantilla de ADD_PROCESS: el mensaje tiene forma fija, asi que solo se
+# serializa el nombre (por el escapado) y los enteros se formatean directo
+_ADD_TEMPLATE = (
+    b'{"type":' + _dumps(_T_ADD) +
+    b',"data":{"name":%s,"burst_time":%d,"arrival_time":%d,"priority":%d}'
+    b',"client_id":null}'
+)
+
+
+def _encode_add_process(name: str, burst_time: int, arrival_time: int, priority: int) -> bytes:
+    """Serializa un ADD_PROCESS; usa _ADD_TEMPLATE si los campos son int."""
+    if type(burst_time) is int and type(arrival_time) is int and type(priority) is int:
+        return _frame(_ADD_TEMPLATE % (_dumps(name), burst_time, arrival_time, priority))
+    return Message(_T_ADD, {
+        'name': name,
+        'burst_time': burst_time,
+        'arrival_time': arrival_time,
+        'priority': priority
+    }).to_bytes()
+
+
+# Forma exacta que produce _ADD_TEMPLATE (nombres sin escapes ni caracteres
+# de control). Cualquier otra variante pasa por el parser JSON generico
+_ADD_PREFIX = b'{"type":' + _dumps(_T_ADD) + b','
+_INT = rb'(-?(?:0|[1-9][0-9]*))'
+_ADD_RE = re.compile(
+    re.escape(_ADD_PREFIX) +
+    rb'"data":\{"name":"([^"\\\x00-\x1f]*)",'
+    rb'"burst_time":' + _INT + rb',"arrival_time":' + _INT + rb',"priority":' + _INT +
+    rb'\},"client_id":(?:null|"([^"\\\x00-\x1f]*)")\}[ \t\r\n]*'
+)
+
+
+# Envoltura de STATE_UPDATE alrededor del estado ya serializado: el
+# estado se codifica solo, sin armar el dict {"type", "data", "client_id"}
+_UPDATE_PREFIX = b'{"type":' + _dumps(_T_UPDATE) + b',"data":'
+_UPDATE_SUFFIX = b',"client_id":null}'
+_UPDATE_OVERHEAD = len(_UPDATE_PREFIX) + len(_UPDATE_SUFFIX)
+
+
+def _state_update_parts(state: dict) -> tuple[bytes, bytes, bytes]:
+    """
+    Serializa un STATE_UPDATE en tres partes: encabezado de longitud con
+    la apertura del sobre, el estado codificado y el cierre del sobre.
+    Concatenadas forman el frame; enviadas con sendmsg() el estado no se
+    copia a otro buffer.
+    """
+    payload = _dumps(state)
+    head = _HEADER.pack(len(payload) + _UPDATE_OVERHEAD) + _UPDATE_PREFIX
+    return head, payload, _UPDATE_SUFFIX
+
+
+class _AddProcessMessage(Message):
+    """
+    Mensaje ADD_PROCESS que se serializa con _ADD_TEMPLATE.
+    
+    Conserva type/data como cualquier Message; si algun campo numerico
+    no es int se usa la serializacion generica.
+    """
+    
+    __slots__ = ()
+    
+    def to_bytes(self) -> bytes:
+        data = self.data
+        return _encode_add_process(data['name'], data['burst_time'],
+                                   data['arrival_time'], data['priority'])
+
+
+_ALGORITHM_MESSAGES = {
+    name: _PrebuiltMessage(_T_ALGORITHM, {'algorithm': name})
+    for name in ALGORITHMS
+}
+_QUANTUM_MESSAGES = {
+    q: _PrebuiltMessage(_T_QUANTUM, {'quantum': q})
+    for q in range(1, 11)
+}
+
+# Mensajes de control sin payload: siempre producen los mismos bytes
+_START_MESSAGE = _PrebuiltMessage(_T_START)
+_PAUSE_MESSAGE = _PrebuiltMessage(_T_PAUSE)
+_RESET_MESSAGE = _PrebuiltMessage(_T_RESET)
+_GET_STATE_MESSAGE = _PrebuiltMessage(_T_GET_STATE)
+_TICK_MESSAGE = _PrebuiltMessage(_T_TICK)
+_DISCONNECT_MESSAGE = _PrebuiltMessage(_T_DISCONNECT)
+
+
 class Protocol:
     """
     Factory de mensajes del protocolo.
@@ -80,77 +259,146 @@ class Protocol:
     Provee metodos estaticos para crear cada tipo de mensaje,
     asegurando el formato correcto y simplificando el codigo
     del cliente y servidor.
+    
+    Los mensajes de control sin payload tambien se exponen ya
+    serializados (START_BYTES, PAUSE_BYTES, ...) para enviarlos
+    directo por el socket, y los que llevan datos tienen variantes
+    *_bytes que retornan los bytes sin crear un Message.
     """
     
+    START_BYTES = _START_MESSAGE.to_bytes()
+    PAUSE_BYTES = _PAUSE_MESSAGE.to_bytes()
+    RESET_BYTES = _RESET_MESSAGE.to_bytes()
+    GET_STATE_BYTES = _GET_STATE_MESSAGE.to_bytes()
+    TICK_BYTES = _TICK_MESSAGE.to_bytes()
+    DISCONNECT_BYTES = _DISCONNECT_MESSAGE.to_bytes()
+    
     @staticmethod
     def add_process(name: str, burst_time: int, arrival_time: int = 0, priority: int = 5) -> Message:
         """Crea mensaje para agregar un nuevo proceso al sistema."""
-        return Message(MSG_TYPES['ADD_PROCESS'], {
+        return _AddProcessMessage(_T_ADD, {
             'name': name,
             'burst_time': burst_time,
             'arrival_time': arrival_time,
             'priority': priority
         })
     
+    @staticmethod
+    def add_process_bytes(name: str, burst_time: int, arrival_time: int = 0,
+                          priority: int = 5) -> bytes:
+        """Como add_process(), pero retorna directamente los bytes a enviar."""
+        return _encode_add_process(name, burst_time, arrival_time, priority)
+    
+    @staticmethod
+    def add_process_encoded(name_json: bytes, burst_time: int, arrival_time: int = 0,
+                            priority: int = 5) -> bytes:
+        """
+        Serializa un ADD_PROCESS cuyo nombre ya viene codificado.
+        
+        Args:
+            name_json: Nombre como string JSON en bytes (con comillas),
+                       ej: b'"Apache"'; util si se reutiliza el nombre
+            burst_time, arrival_time, priority: Enteros del proceso
+            
+        Returns:
+            Mensaje listo para enviar (incluye el encabezado de longitud)
+        """
+        return _frame(_ADD_TEMPLATE % (name_json, burst_time, arrival_time, priority))
+    
     @staticmethod
     def remove_process(pid: int) -> Message:
         """Crea mensaje para eliminar un proceso por su PID."""
-        return Message(MSG_TYPES['REMOVE_PROCESS'], {'pid': pid})
+        return Message(_T_REMOVE, {'pid': pid})
     
     @staticmethod
     def start_simulation() -> Message:
         """Crea mensaje para iniciar la simulacion."""
-        return Message(MSG_TYPES['START_SIM'])
+        return _START_MESSAGE
     
     @staticmethod
     def pause_simulation() -> Message:
         """Crea mensaje para pausar/reanudar la simulacion."""
-        return Message(MSG_TYPES['PAUSE_SIM'])
+        return _PAUSE_MESSAGE
     
     @staticmethod
     def reset_simulation() -> Message:
         """Crea mensaje para reiniciar la simulacion a tiempo 0."""
-        return Message(MSG_TYPES['RESET_SIM'])
+        return _RESET_MESSAGE
     
     @staticmethod
     def set_algorithm(algorithm: str) -> Message:
         """Crea mensaje para cambiar el algoritmo de scheduling."""
-        return Message(MSG_TYPES['SET_ALGORITHM'], {'algorithm': algorithm})
+        msg = _ALGORITHM_MESSAGES.get(algorithm)
+        if msg is None:
+            msg = Message(_T_ALGORITHM, {'algorithm': algorithm})
+        return msg
     
     @staticmethod
     def set_quantum(quantum: int) -> Message:
         """Crea mensaje para establecer el quantum de Round Robin."""
-        return Message(MSG_TYPES['SET_QUANTUM'], {'quantum': quantum})
+        msg = _QUANTUM_MESSAGES.get(quantum)
+        if msg is None:
+            msg = Message(_T_QUANTUM, {'quantum': quantum})
+        return msg
+    
+    @staticmethod
+    def set_algorithm_bytes(algorithm: str) -> bytes:
+        """Como set_algorithm(), pero retorna directamente los bytes a enviar."""
+        msg = _ALGORITHM_MESSAGES.get(algorithm)
+        if msg is None:
+            return Message(_T_ALGORITHM, {'algorithm': algorithm}).to_bytes()
+        return msg.to_bytes()
+    
+    @staticmethod
+    def set_quantum_bytes(quantum: int) -> bytes:
+        """Como set_quantum(), pero retorna directamente los bytes a enviar."""
+        msg = _QUANTUM_MESSAGES.get(quantum)
+        if msg is None:
+            return Message(_T_QUANTUM, {'quantum': quantum}).to_bytes()
+        return msg.to_bytes()
     
     @staticmethod
     def get_state() -> Message:
         """Crea mensaje para solicitar el estado actual."""
-        return Message(MSG_TYPES['GET_STATE'])
+        return _GET_STATE_MESSAGE
     
     @staticmethod
     def state_update(state: dict) -> Message:
         """Crea mensaje con el estado completo de la simulacion."""
-        return Message(MSG_TYPES['STATE_UPDATE'], state)
+        return Message(_T_UPDATE, state)
+    
+    @staticmethod
+    def state_update_bytes(state: dict) -> bytes:
+        """Como state_update(), pero retorna directamente los bytes a enviar."""
+        return b''.join(_state_update_parts(state))
+    
+    @staticmethod
+    def state_update_parts(state: dict) -> tuple[bytes, bytes, bytes]:
+        """
+        Como state_update_bytes(), pero sin concatenar: retorna las partes
+        del frame para enviarlas juntas con socket.sendmsg().
+        """
+        return _state_update_parts(state)
     
     @staticmethod
     def tick() -> Message:
         """Crea mensaje para avanzar un tick manual."""
-        return Message(MSG_TYPES['TICK'])
+        return _TICK_MESSAGE
     
     @staticmethod
     def ack(data: Any = None) -> Message:
         """Crea mensaje de confirmacion."""
-        return Message(MSG_TYPES['ACK'], data)
+        return Message(_T_ACK, data)
     
     @staticmethod
     def error(error_msg: str) -> Message:
         """Crea mensaje de error."""
-        return Message(MSG_TYPES['ERROR'], error_msg)
+        return Message(_T_ERROR, error_msg)
     
     @staticmethod
     def disconnect() -> Message:
         """Crea mensaje de desconexion."""
-        return Message(MSG_TYPES['DISCONNECT'])
+        return _DISCONNECT_MESSAGE
 
 
 class MessageBuffer:
@@ -160,7 +408,7 @@ class MessageBuffer:
     TCP es un protocolo de stream, no de mensajes. Esto significa que
     los datos pueden llegar fragmentados o multiples mensajes pueden
     llegar juntos en una sola lectura. Este buffer acumula los datos
-    recibidos y extrae mensajes completos (delimitados por \n).
+    recibidos y extrae mensajes completos segun su prefijo de longitud.
     
     Ejemplo de uso:
         buffer = MessageBuffer()
@@ -169,10 +417,75 @@ class MessageBuffer:
         messages = buffer.add_data(data)
         for msg in messages:
             process(msg)
+    
+    Si solo interesa el ultimo mensaje de cierto tipo, add_frames()
+    retorna los payloads crudos sin deserializar (ver peek_type).
+    
+    Con max_frame, un encabezado que anuncia un payload mayor lanza
+    ProtocolError en cuanto se lee, sin acumular esos bytes; asi un
+    cliente defectuoso no hace crecer el buffer sin limite.
     """
     
-    def __init__(self):
-        self.buffer = ""
+    def __init__(self, max_frame: Optional[int] = None):
+        self.max_frame = max_frame
+        self.buffer = bytearray()
+        # Inicio del primer mensaje aun no consumido; los bytes anteriores
+        # se descartan en bloque cuando ocupan mas de la mitad del buffer
+        self._head = 0
+    
+    def add_frames(self, data: bytes) -> list[bytes]:
+        """
+        Agrega datos al buffer y extrae los frames completos sin parsear.
+        
+        Un mensaje grande que llega en varios recv() solo requiere leer
+        su encabezado en cada llamada; el payload no se recorre.
+        
+        Args:
+            data: Bytes recibidos del socket (bytes, bytearray o memoryview;
+                  se copian al buffer, asi que el llamador puede reusarlos)
+            
+        Returns:
+            Lista de frames crudos (payload JSON sin el encabezado)
+            
+        Raises:
+            ProtocolError: Si un frame excede max_frame (el buffer se
+                           descarta; el stream ya no es recuperable)
+        """
+        buffer = self.buffer
+        buffer.extend(data)
+        frames = []
+        
+        # Extraer frames completos. Cada payload se copia una sola vez,
+        # de la vista del buffer directo a bytes
+        start = self._head
+        end = len(buffer)
+        max_frame = self.max_frame
+        with memoryview(buffer) as view:
+            while end - start >= HEADER_SIZE:
+                body = start + HEADER_SIZE
+                size = _HEADER.unpack_from(buffer, start)[0]
+                if max_frame is not None and size > max_frame:
+                    frames = None
+                    break
+                stop = body + size
+                if stop > end:
+                    break
+                if stop > body:
+                    frames.append(bytes(view[body:stop]))
+                start = stop
+        
+        if frames is None:
+            self.clear()
+            raise ProtocolError(f"Frame de {size} bytes excede el maximo de {max_frame}")
+        
+        self._head = start
+        
+        # Compactar solo cuando lo consumido domina el buffer, para no
+        # desplazar memoria en cada llamada
+        if start > end // 2:
+            del buffer[:start]
+            self._head = 0
+        return frames
     
     def add_data(self, data: bytes) -> list[Message]:
         """
@@ -184,20 +497,39 @@ class MessageBuffer:
         Returns:
             Lista de mensajes completos encontrados
         """
-        self.buffer += data.decode('utf-8')
         messages = []
-        
-        # Extraer mensajes completos (terminados en \n)
-        while '\n' in self.buffer:
-            line, self.buffer = self.buffer.split('\n', 1)
-            if line.strip():
-                try:
-                    messages.append(Message.from_json(line))
-                except Exception:
-                    pass
-        
+        for frame in self.add_frames(data):
+            try:
+                messages.append(Message.from_bytes(frame))
+            except Exception:
+                pass
         return messages
     
     def clear(self):
         """Limpia el buffer descartando datos pendientes."""
-        self.buffer = ""
+        self.buffer.clear()
+        self._head = 0
+
+
+def peek_type(frame: bytes) -> Optional[str]:
+    """
+    Obtiene el tipo de un frame crudo sin deserializar el JSON completo.
+    
+    Permite descartar mensajes intermedios (ej: STATE_UPDATE obsoletos)
+    sin pagar el costo de json.loads sobre todo el payload.
+    
+    Args:
+        frame: Payload JSON crudo recibido del socket
+        
+    Returns:
+        Valor del campo "type", o None si no se encuentra
+    """
+    idx = frame.find(b'"type"')
+    if idx == -1:
+        return None
+    colon = frame.find(b':', idx + 6)
+    start = frame.find(b'"', colon + 1) if colon != -1 else -1
+    end = frame.find(b'"', start + 1) if start != -1 else -1
+    if end == -1:
+        return None
+    return frame[start + 1:end].decode('utf-8')
@@ -33,11 +33,18 @@ Materia: Sistemas Operativos - UABC 2025
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List, Tuple
+from operator import attrgetter
+from typing import Callable, Dict, Optional, List, Tuple
 from process import Process, ProcessState, ProcessQueue
 from config import DEFAULT_QUANTUM
 
 
+# Llaves de orden de la cola READY (desempate por llegada y luego PID)
+_FCFS_KEY = attrgetter('arrival_time', 'pid')
+_SJF_KEY = attrgetter('remaining_time', 'arrival_time', 'pid')
+_PRIO_KEY = attrgetter('priority', 'arrival_time', 'pid')
+
+
 class SchedulingAlgorithm(ABC):
     """
     Clase base abstracta para algoritmos de scheduling.
@@ -46,11 +53,26 @@ class SchedulingAlgorithm(ABC):
     - select_next(): Selecciona el proximo proceso a ejecutar
     - get_time_slice(): Determina cuanto tiempo ejecutara
     - is_preemptive(): Indica si el algoritmo puede interrumpir procesos
+    - reset(): Reinicia su estado interno, si lo tiene
+    
+    Los algoritmos que eligen siempre el minimo de una llave fija definen
+    ready_key; el SchedulerManager la usa para mantener un heap de READY
+    (ProcessQueue.pop_ready) y no llama a select_next en cada seleccion.
+    Si ademas definen preempt_on_key, el proceso en CPU se desaloja en
+    cuanto un proceso READY tiene una llave menor que la suya.
     """
     
-    def __init__(self):
-        self.name = "Base"
-        self.description = "Algoritmo base"
+    # Sin __dict__ por instancia; las subclases con estado declaran el suyo
+    __slots__ = ()
+    
+    # Llave de orden de la cola READY, o None si la seleccion no es un minimo
+    ready_key: Optional[Callable[[Process], tuple]] = None
+    
+    # Desalojar al proceso en CPU cuando un READY lo supera en ready_key
+    preempt_on_key = False
+    
+    name = "Base"
+    description = "Algoritmo base"
     
     @abstractmethod
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
@@ -58,7 +80,8 @@ class SchedulingAlgorithm(ABC):
         Selecciona el proximo proceso a ejecutar de la cola ready.
         
         Args:
-            ready_queue:  Lista de procesos en estado READY
+            ready_queue:  Lista de procesos en estado READY, ordenada por
+                          (arrival_time, pid)
             current_time: Tiempo actual del sistema
             
         Returns:
@@ -82,6 +105,10 @@ class SchedulingAlgorithm(ABC):
         """
         pass
     
+    def reset(self):
+        """Reinicia el estado interno del algoritmo (por defecto no tiene)."""
+        pass
+    
     def is_preemptive(self) -> bool:
         """Indica si el algoritmo puede interrumpir un proceso en ejecucion."""
         return False
@@ -103,17 +130,17 @@ class FCFSScheduler(SchedulingAlgorithm):
     - Tiempo de espera promedio alto
     """
     
-    def __init__(self):
-        super().__init__()
-        self.name = "FCFS"
-        self.description = "First Come First Served - Procesos se ejecutan en orden de llegada"
+    __slots__ = ()
+    
+    name = "FCFS"
+    description = "First Come First Served - Procesos se ejecutan en orden de llegada"
+    ready_key = _FCFS_KEY
     
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
         if not ready_queue:
             return None
-        # Ordenar por tiempo de llegada, desempatar por PID
-        sorted_queue = sorted(ready_queue, key=lambda p: (p.arrival_time, p.pid))
-        return sorted_queue[0]
+        # La cola ya viene por tiempo de llegada, desempatando por PID
+        return ready_queue[0]
     
     def get_time_slice(self, process: Process) -> int:
         return process.remaining_time
@@ -136,17 +163,17 @@ class SJFScheduler(SchedulingAlgorithm):
     - Puede causar starvation de procesos largos
     """
     
-    def __init__(self):
-        super().__init__()
-        self.name = "SJF"
-        self.description = "Shortest Job First - Proceso mas corto se ejecuta primero"
+    __slots__ = ()
+    
+    name = "SJF"
+    description = "Shortest Job First - Proceso mas corto se ejecuta primero"
+    ready_key = _SJF_KEY
     
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
         if not ready_queue:
             return None
-        # Ordenar por remaining_time para manejar procesos parcialmente ejecutados
-        sorted_queue = sorted(ready_queue, key=lambda p: (p.remaining_time, p.arrival_time, p.pid))
-        return sorted_queue[0]
+        # Menor remaining_time para manejar procesos parcialmente ejecutados
+        return min(ready_queue, key=_SJF_KEY)
     
     def get_time_slice(self, process: Process) -> int:
         return process.remaining_time
@@ -159,24 +186,26 @@ class SRTFScheduler(SchedulingAlgorithm):
     Version preemptiva de SJF. Si llega un proceso con menor remaining_time
     que el proceso actual, se hace preemption.
     
-    Para simular preemption, ejecutamos solo 1 unidad de tiempo por tick
-    y re-evaluamos la cola en cada tick.
+    El proceso ejecuta hasta terminar salvo que en algun tick el minimo de
+    la cola READY tenga una llave menor que la suya (preempt_on_key); el
+    SchedulerManager lo compara en cada tick contra la cima del heap.
     """
     
-    def __init__(self):
-        super().__init__()
-        self.name = "SRTF"
-        self.description = "Shortest Remaining Time First - Version preemptiva de SJF"
+    __slots__ = ()
+    
+    name = "SRTF"
+    description = "Shortest Remaining Time First - Version preemptiva de SJF"
+    ready_key = _SJF_KEY
+    preempt_on_key = True
     
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
         if not ready_queue:
             return None
-        sorted_queue = sorted(ready_queue, key=lambda p: (p.remaining_time, p.arrival_time, p.pid))
-        return sorted_queue[0]
+        return min(ready_queue, key=_SJF_KEY)
     
     def get_time_slice(self, process: Process) -> int:
-        # Ejecutar solo 1 unidad para permitir preemption en cada tick
-        return 1
+        # La preemption la decide la llegada de un proceso mas corto
+        return process.remaining_time
     
     def is_preemptive(self) -> bool:
         return True
@@ -199,17 +228,17 @@ class PriorityScheduler(SchedulingAlgorithm):
     - Solucion: aging (incrementar prioridad con el tiempo)
     """
     
-    def __init__(self):
-        super().__init__()
-        self.name = "Priority"
-        self.description = "Priority Scheduling - Proceso con mayor prioridad se ejecuta primero"
+    __slots__ = ()
+    
+    name = "Priority"
+    description = "Priority Scheduling - Proceso con mayor prioridad se ejecuta primero"
+    ready_key = _PRIO_KEY
     
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
         if not ready_queue:
             return None
         # Menor numero = mayor prioridad
-        sorted_queue = sorted(ready_queue, key=lambda p: (p.priority, p.arrival_time, p.pid))
-        return sorted_queue[0]
+        return min(ready_queue, key=_PRIO_KEY)
     
     def get_time_slice(self, process: Process) -> int:
         return process.remaining_time
@@ -239,13 +268,18 @@ class RoundRobinScheduler(SchedulingAlgorithm):
     - Regla practica: 80% de procesos deben terminar en un quantum
     """
     
+    __slots__ = ('name', 'description', 'quantum')
+    
+    # Llave constante: el heap de READY desempata por orden de entrada a
+    # READY, asi que funciona como la cola FIFO circular del algoritmo
+    # (un proceso desalojado entra al final)
+    ready_key = staticmethod(lambda p: 0)
+    
     def __init__(self, quantum: int = DEFAULT_QUANTUM):
         super().__init__()
         self.name = "Round Robin"
         self.description = f"Round Robin - Cada proceso ejecuta por {quantum} unidades de tiempo"
         self.quantum = quantum
-        self._current_index = 0
-        self._last_process_pid = None
     
     def set_quantum(self, quantum: int):
         """Actualiza el valor del quantum."""
@@ -254,27 +288,11 @@ class RoundRobinScheduler(SchedulingAlgorithm):
     
     def select_next(self, ready_queue: List[Process], current_time: int) -> Optional[Process]:
         if not ready_queue:
-            self._current_index = 0
             return None
-        
-        # Mantener orden de llegada para rotacion justa
-        sorted_queue = sorted(ready_queue, key=lambda p: (p.arrival_time, p.pid))
-        
-        # Rotar al siguiente proceso despues de preemption
-        if self._last_process_pid is not None:
-            try:
-                last_idx = next(i for i, p in enumerate(sorted_queue) 
-                               if p.pid == self._last_process_pid)
-                self._current_index = (last_idx + 1) % len(sorted_queue)
-            except StopIteration:
-                self._current_index = 0
-        
-        if self._current_index >= len(sorted_queue):
-            self._current_index = 0
-        
-        selected = sorted_queue[self._current_index]
-        self._last_process_pid = selected.pid
-        return selected
+        # La rotacion la da el orden de la cola: un proceso desalojado
+        # vuelve a READY al final (ver ready_key), asi que basta tomar el
+        # primero
+        return ready_queue[0]
     
     def get_time_slice(self, process: Process) -> int:
         # Ejecutar quantum o lo que reste, lo que sea menor
@@ -282,11 +300,21 @@ class RoundRobinScheduler(SchedulingAlgorithm):
     
     def is_preemptive(self) -> bool:
         return True
-    
-    def reset(self):
-        """Reinicia el estado interno del scheduler."""
-        self._current_index = 0
-        self._last_process_pid = None
+
+
+# Entrada previa a la primera del Gantt: ningun pid real ni idle coincide
+_GANTT_SENTINEL = (-2, -1, -1)
+
+# Versiones recientes que get_delta_since() acepta como base
+_MAX_STATE_MARKS = 16
+
+
+# Instancias compartidas de los algoritmos sin estado interno; Round Robin
+# guarda su quantum, asi que cada SchedulerManager crea el suyo
+_FCFS = FCFSScheduler()
+_SJF = SJFScheduler()
+_SRTF = SRTFScheduler()
+_PRIORITY = PriorityScheduler()
 
 
 class SchedulerManager:
@@ -307,77 +335,150 @@ class SchedulerManager:
     def __init__(self):
         # Algoritmos disponibles
         self.algorithms = {
-            'FCFS': FCFSScheduler(),
-            'SJF': SJFScheduler(),
-            'SRTF': SRTFScheduler(),
-            'PRIORITY': PriorityScheduler(),
+            'FCFS': _FCFS,
+            'SJF': _SJF,
+            'SRTF': _SRTF,
+            'PRIORITY': _PRIORITY,
             'RR': RoundRobinScheduler()
         }
-        self.current_algorithm = self.algorithms['FCFS']
         
         # Estado de la simulacion
         self.process_queue = ProcessQueue()
+        self._bind_algorithm(self.algorithms['FCFS'])
         self.current_time = 0
         self.running_process: Optional[Process] = None
         self.time_slice_remaining = 0
         
-        # Gantt chart: lista de tuplas (pid, start_time, end_time)
-        # pid=-1 indica CPU idle
-        self.gantt_chart: List[Tuple[int, int, int]] = []
+        # Gantt chart: lista de entradas [pid, start_time, end_time]
+        # pid=-1 indica CPU idle. Las entradas son listas para extender la
+        # ultima en su lugar (end_time) sin crear una entrada nueva por tick
+        self.gantt_chart: List[List[int]] = []
+        # Ultima entrada del Gantt; el centinela (pid=-2) evita revisar si
+        # la lista esta vacia antes de comparar
+        self._gantt_last = _GANTT_SENTINEL
         
         # Control de simulacion
         self.is_running = False
         self.is_paused = False
         self._context_switches = 0
+        
+        # Version del estado: se incrementa en cada cambio observable para
+        # que los clientes puedan omitir el redibujado si no cambio nada
+        self.version = 0
+        
+        # Version de la lista de procesos (altas/bajas). Mientras no cambie,
+        # los clientes pueden recibir solo los campos mutables de cada uno
+        self.roster_version = 0
+        
+        # Sumas para las estadisticas, actualizadas al agregar, quitar o
+        # completar procesos en lugar de recorrerlos en cada get_statistics
+        self._sum_burst = 0
+        self._sum_wait = 0
+        self._sum_turnaround = 0
+        self._sum_response = 0
+        
+        # Ultimo estado armado por get_state (uno por valor de full) y la
+        # version alcanzada por el ultimo tick sin cambios en los procesos
+        self._state_cache: dict[bool, dict] = {}
+        self._idle_version = -1
+        
+        # Por cada version entregada en get_state (las ultimas
+        # _MAX_STATE_MARKS): (roster_version, largo del Gantt). Con esto
+        # get_delta_since() sabe que parte del estado ya tiene un cliente
+        self._state_marks: Dict[int, Tuple[int, int]] = {}
     
     def set_algorithm(self, algorithm_name: str) -> bool:
         """Cambia el algoritmo de scheduling activo."""
         if algorithm_name in self.algorithms:
-            self.current_algorithm = self.algorithms[algorithm_name]
-            if isinstance(self.current_algorithm, RoundRobinScheduler):
-                self.current_algorithm.reset()
+            self._bind_algorithm(self.algorithms[algorithm_name])
+            self.current_algorithm.reset()
+            self.version += 1
             return True
         return False
     
+    def _bind_algorithm(self, algorithm: SchedulingAlgorithm):
+        """
+        Activa un algoritmo y guarda lo que tick() consulta en cada
+        seleccion (metodo de time slice, si es preemptivo y si usa el
+        heap de READY), para no resolverlo en cada tick.
+        """
+        self.current_algorithm = algorithm
+        self.process_queue.set_ready_key(algorithm.ready_key)
+        self._get_slice = algorithm.get_time_slice
+        self._preemptive = algorithm.is_preemptive()
+        self._keyed = algorithm.ready_key is not None
+        self._key_preempt = self._keyed and algorithm.preempt_on_key
+    
     def set_quantum(self, quantum: int):
-        """Configura el quantum para Round Robin."""
-        if 'RR' in self.algorithms:
-            self.algorithms['RR'].set_quantum(quantum)
+        """Configura el quantum para Round Robin (sin cambios si es el mismo)."""
+        rr = self.algorithms.get('RR')
+        if rr is not None and rr.quantum != quantum:
+            rr.set_quantum(quantum)
+            self.version += 1
     
     def add_process(self, process: Process):
         """Agrega un proceso al sistema con un color unico asignado."""
         process.color_index = len(self.process_queue) % 12
         self.process_queue.add(process)
+        self._sum_burst += process.burst_time
+        if process.state == ProcessState.COMPLETED:
+            self._account_completed(process, 1)
+        self.version += 1
+        self.roster_version += 1
     
     def remove_process(self, pid: int) -> bool:
         """Elimina un proceso del sistema."""
-        return self.process_queue.remove(pid) is not None
+        process = self.process_queue.remove(pid)
+        if process is None:
+            return False
+        self._sum_burst -= process.burst_time
+        if process.state == ProcessState.COMPLETED:
+            self._account_completed(process, -1)
+        self.version += 1
+        self.roster_version += 1
+        return True
+    
+    def _account_completed(self, process: Process, sign: int):
+        """Suma (sign=1) o resta (sign=-1) un proceso completado a las estadisticas."""
+        self._sum_wait += sign * process.waiting_time
+        self._sum_turnaround += sign * process.turnaround_time
+        self._sum_response += sign * (process.response_time or 0)
     
     def start(self):
         """Inicia la simulacion."""
         self.is_running = True
         self.is_paused = False
+        self.version += 1
     
     def pause(self):
         """Pausa la simulacion."""
         self.is_paused = True
+        self.version += 1
     
     def resume(self):
         """Reanuda la simulacion pausada."""
         self.is_paused = False
+        self.version += 1
     
     def reset(self):
         """Reinicia la simulacion a tiempo 0."""
+        self.version += 1
         self.current_time = 0
+        self.process_queue.clock = 0
         self.running_process = None
         self.time_slice_remaining = 0
         self.gantt_chart.clear()
+        self._gantt_last = _GANTT_SENTINEL
+        # El Gantt se vacio: ningun estado anterior sirve de base para deltas
+        self._state_marks.clear()
         self.is_running = False
         self.is_paused = False
         self._context_switches = 0
+        self._sum_wait = 0
+        self._sum_turnaround = 0
+        self._sum_response = 0
         self.process_queue.reset_all()
-        if isinstance(self.current_algorithm, RoundRobinScheduler):
-            self.current_algorithm.reset()
+        self.current_algorithm.reset()
     
     def tick(self) -> dict:
         """
@@ -385,7 +486,7 @@ class SchedulerManager:
         
         Logica principal:
         1. Verificar si la simulacion esta activa
-        2. Obtener procesos listos en el tiempo actual
+        2. Admitir los procesos que ya llegaron
         3. Manejar preemption si el algoritmo lo requiere
         4. Seleccionar proceso si la CPU esta libre
         5. Ejecutar proceso actual
@@ -395,93 +496,301 @@ class SchedulerManager:
         Returns:
             Estado actual de la simulacion
         """
+        self.step()
+        return self.get_state()
+    
+    def step(self):
+        """
+        Ejecuta un tick como tick(), pero sin armar el estado.
+        
+        Para quien consulta el estado aparte (ej: el servidor, que lo
+        serializa una vez por version para todos sus clientes).
+        """
+        self._advance()
+    
+    def run_to_completion(self, max_ticks: Optional[int] = None) -> dict:
+        """
+        Avanza la simulacion hasta que todos los procesos terminen.
+        
+        Pensado para corridas batch (comparar algoritmos o quantums): no
+        arma el estado de cada tick, solo el final.
+        
+        Args:
+            max_ticks: Limite opcional de ticks a ejecutar
+            
+        Returns:
+            Estado final de la simulacion
+        """
+        if self.process_queue:
+            ticks = 0
+            while self.is_running and not self.is_paused:
+                if max_ticks is not None and ticks >= max_ticks:
+                    break
+                limit = None if max_ticks is None else max_ticks - ticks
+                ticks += self._advance_to_next_event(limit)
+        return self.get_state()
+    
+    def tick_to_next_event(self, max_ticks: Optional[int] = None) -> dict:
+        """
+        Avanza hasta el siguiente evento en un solo paso.
+        
+        Si la CPU esta idle sin procesos READY, salta hasta la siguiente
+        llegada. Si el proceso en CPU aun tiene time slice (el resto de su
+        burst en FCFS/SJF/Priority o de su quantum en RR), ejecuta todo el
+        tramo de una vez. En otro caso equivale a tick().
+        
+        El resultado es el mismo que con tick() repetido, salvo que el
+        tramo queda como una sola entrada en execution_history y version
+        avanza una sola vez.
+        
+        Args:
+            max_ticks: Limite opcional de ticks a avanzar
+            
+        Returns:
+            Estado de la simulacion despues del salto
+        """
+        self._advance_to_next_event(max_ticks)
+        return self.get_state()
+    
+    def _advance_to_next_event(self, limit: Optional[int] = None) -> int:
+        """
+        Avanza un tramo sin eventos (ver tick_to_next_event).
+        
+        Returns:
+            Cantidad de ticks avanzados
+        """
+        queue = self.process_queue
+        t0 = self.current_time
+        process = self.running_process
+        jump = 0
+        if self.is_running and not self.is_paused:
+            if process is not None:
+                # Nada lo interrumpe hasta agotar su time slice o terminar,
+                # salvo una llegada si el algoritmo desaloja por llave
+                jump = min(self.time_slice_remaining, process.remaining_time)
+                if self._key_preempt:
+                    arrival = queue.next_arrival()
+                    if arrival is not None:
+                        jump = min(jump, arrival - t0)
+                    if self._outranked(process):
+                        jump = 0
+            elif queue.count(ProcessState.READY) == 0:
+                # CPU idle hasta la siguiente llegada
+                arrival = queue.next_arrival()
+                if arrival is not None:
+                    jump = arrival - t0
+            if limit is not None:
+                jump = min(jump, limit)
+        
+        # Un tick normal tambien detecta el fin de la simulacion
+        if jump <= 1 or queue.all_completed():
+            self._advance()
+            return 1
+        
+        end = t0 + jump
+        if process is not None:
+            # Admitir cada llegada del tramo en su propio tiempo, para que
+            # su espera cuente desde ahi
+            queue.clock = t0
+            queue.admit(t0)
+            arrival = queue.next_arrival()
+            while arrival is not None and arrival < end:
+                queue.clock = arrival
+                queue.admit(arrival)
+                arrival = queue.next_arrival()
+            
+            executed = process.execute(jump, t0)
+            self.time_slice_remaining -= executed
+            self._record_gantt(process.pid, t0, t0 + executed)
+            if process.state == ProcessState.COMPLETED:
+                process.calculate_waiting_time()
+                if process in queue:
+                    self._account_completed(process, 1)
+                self.running_process = None
+        else:
+            self._record_gantt(-1, t0, end)
+        
+        self.current_time = end
+        queue.clock = end
+        self.version += 1
+        if process is None:
+            self._idle_version = self.version
+        return jump
+    
+    def _advance(self):
+        """Avanza la simulacion un tick sin armar el estado (ver tick)."""
         if not self.is_running or self.is_paused:
-            return self.get_state()
+            return
         
         # Terminar si todos los procesos completaron
         if self.process_queue.all_completed():
             self.is_running = False
-            return self.get_state()
+            self.version += 1
+            return
         
-        # Obtener procesos que ya llegaron y estan listos
-        ready_queue = self.process_queue.get_ready_processes(self.current_time)
-        
-        # Transicionar procesos NEW a READY
-        for p in ready_queue:
-            if p.state == ProcessState.NEW:
-                p.state = ProcessState.READY
+        # Transicionar a READY los procesos NEW que ya llegaron. La cola
+        # lleva el tiempo de espera de los READY a partir de su reloj
+        self.process_queue.clock = self.current_time
+        admitted = self.process_queue.admit(self.current_time)
         
         # Manejar preemption para algoritmos preemptivos
-        if self.running_process and self.current_algorithm.is_preemptive():
-            if self.time_slice_remaining <= 0:
+        preempted = None
+        if self.running_process and self._preemptive:
+            if self.time_slice_remaining <= 0 or (
+                    self._key_preempt and self._outranked(self.running_process)):
+                preempted = self.running_process
                 self.running_process.preempt()
                 self._context_switches += 1
                 self.running_process = None
         
         # Seleccionar proceso si CPU esta libre
         if self.running_process is None:
-            ready_for_exec = [p for p in ready_queue if p.state == ProcessState.READY]
-            if ready_for_exec:
-                self.running_process = self.current_algorithm.select_next(
-                    ready_for_exec, self.current_time)
-                if self.running_process:
-                    self.time_slice_remaining = self.current_algorithm.get_time_slice(
-                        self.running_process)
-                    if self.running_process.state != ProcessState.RUNNING:
-                        self._context_switches += 1
-        
-        # Ejecutar proceso actual
-        if self.running_process:
-            executed = self.running_process.execute(1, self.current_time)
-            self.time_slice_remaining -= executed
-            
-            # Actualizar Gantt chart
-            if self.gantt_chart and self.gantt_chart[-1][0] == self.running_process.pid:
-                # Extender entrada existente
-                old = self.gantt_chart[-1]
-                self.gantt_chart[-1] = (old[0], old[1], self.current_time + executed)
+            if self._keyed:
+                # Minimo por llave desde el heap de READY. Como ready_queue,
+                # no incluye al proceso recien desalojado en este tick
+                self.running_process = self.process_queue.pop_ready(exclude=preempted)
             else:
-                # Nueva entrada
-                self.gantt_chart.append((
-                    self.running_process.pid, 
-                    self.current_time, 
-                    self.current_time + executed
-                ))
+                # La lista ya viene ordenada y sin procesos NEW (se admitieron
+                # arriba); solo se filtra si hubo preemption en este tick
+                ready_for_exec = self.process_queue.get_ready_processes(self.current_time)
+                if preempted is not None:
+                    ready_for_exec = [p for p in ready_for_exec if p is not preempted]
+                if ready_for_exec:
+                    self.running_process = self.current_algorithm.select_next(
+                        ready_for_exec, self.current_time)
+            if self.running_process:
+                self.time_slice_remaining = self._get_slice(self.running_process)
+                if self.running_process.state != ProcessState.RUNNING:
+                    self._context_switches += 1
+        
+        # Ejecutar proceso actual (pid=-1 registra la CPU idle)
+        process = self.running_process
+        if process:
+            executed = process.execute(1, self.current_time)
+            self.time_slice_remaining -= executed
+            pid = process.pid
+            end = self.current_time + executed
             
             # Proceso termino
-            if self.running_process.state == ProcessState.COMPLETED:
-                self.running_process.calculate_waiting_time()
+            if process.state == ProcessState.COMPLETED:
+                process.calculate_waiting_time()
+                # Un proceso eliminado mientras ejecutaba ya no cuenta
+                if process in self.process_queue:
+                    self._account_completed(process, 1)
                 self.running_process = None
         else:
-            # CPU idle - registrar en Gantt
-            if not self.gantt_chart or self.gantt_chart[-1][0] != -1:
-                self.gantt_chart.append((-1, self.current_time, self.current_time + 1))
-            else:
-                old = self.gantt_chart[-1]
-                self.gantt_chart[-1] = (old[0], old[1], self.current_time + 1)
+            pid = -1
+            end = self.current_time + 1
         
-        # Incrementar waiting_time para procesos en READY
-        for p in ready_queue:
-            if p.state == ProcessState.READY and p != self.running_process:
-                p.waiting_time += 1
+        self._record_gantt(pid, self.current_time, end)
         
         self.current_time += 1
-        return self.get_state()
+        self.process_queue.clock = self.current_time
+        self.version += 1
+        
+        # CPU idle sin llegadas ni preemption: ningun proceso cambio
+        if process is None and preempted is None and not admitted:
+            self._idle_version = self.version
+    
+    def _outranked(self, process: Process) -> bool:
+        """Indica si algun proceso READY tiene menor ready_key que process."""
+        best = self.process_queue.peek_ready_key()
+        return best is not None and best < self.current_algorithm.ready_key(process)
+    
+    def _record_gantt(self, pid: int, start: int, end: int):
+        """Actualiza el Gantt: extiende la ultima entrada o agrega una."""
+        last = self._gantt_last
+        if last[0] == pid:
+            last[2] = end
+        else:
+            last = [pid, start, end]
+            self.gantt_chart.append(last)
+            self._gantt_last = last
     
-    def get_state(self) -> dict:
-        """Retorna el estado completo de la simulacion para enviar a clientes."""
-        return {
+    def get_state(self, full: bool = True) -> dict:
+        """
+        Retorna el estado de la simulacion para enviar a clientes.
+        
+        Args:
+            full: Si es False, cada proceso incluye solo sus campos
+                  mutables (ver Process.to_delta_dict). Solo es valido
+                  para clientes que ya tienen el snapshot completo de la
+                  misma roster_version.
+        
+        Si desde el estado anterior solo paso un tick idle (ningun proceso
+        cambio), se reutiliza ese estado actualizando el tiempo y las
+        estadisticas. Los dicts retornados no deben modificarse.
+        """
+        cached = self._state_cache.get(full)
+        if (cached is not None and self._idle_version == self.version
+                and cached['version'] == self.version - 1):
+            state = cached.copy()
+            state['version'] = self.version
+            state['current_time'] = self.current_time
+            state['statistics'] = self.get_statistics()
+            self._state_cache[full] = state
+            self._mark_state()
+            return state
+        
+        if full:
+            processes = [p.to_dict() for p in self.process_queue.processes]
+        else:
+            processes = [p.to_delta_dict() for p in self.process_queue.processes]
+        
+        state = {
+            'version': self.version,
+            'roster_version': self.roster_version,
+            'processes_delta': not full,
             'current_time': self.current_time,
             'algorithm': self.current_algorithm.name,
             'algorithm_desc': self.current_algorithm.description,
             'is_running': self.is_running,
             'is_paused': self.is_paused,
             'running_process': self.running_process.to_dict() if self.running_process else None,
-            'processes': [p.to_dict() for p in self.process_queue.processes],
+            'processes': processes,
             'gantt_chart': self.gantt_chart,
             'statistics': self.get_statistics(),
             'context_switches': self._context_switches
         }
+        self._state_cache[full] = state
+        self._mark_state()
+        return state
+    
+    def _mark_state(self):
+        """Registra roster y largo del Gantt de la version actual."""
+        marks = self._state_marks
+        marks[self.version] = (self.roster_version, len(self.gantt_chart))
+        if len(marks) > _MAX_STATE_MARKS:
+            # Los dicts conservan el orden de insercion: el primero es el mas viejo
+            del marks[next(iter(marks))]
+    
+    def get_delta_since(self, version: int) -> Optional[dict]:
+        """
+        Retorna el estado como delta respecto a una version ya entregada.
+        
+        Ademas de los procesos como deltas (get_state(full=False)), el
+        Gantt incluye solo las entradas desde gantt_from: la ultima que
+        tenia el cliente (que pudo haberse extendido) y las nuevas. Asi
+        el tamano del mensaje no crece con la duracion de la simulacion.
+        
+        Args:
+            version: Version de un get_state anterior que el cliente ya
+                     aplico (o una posterior)
+        
+        Returns:
+            El estado con 'gantt_from' y 'base_version', o None si esa
+            version ya no esta registrada, cambio la lista de procesos o
+            hubo un reset desde entonces (hay que enviar el estado completo)
+        """
+        mark = self._state_marks.get(version)
+        if mark is None or mark[0] != self.roster_version:
+            return None
+        state = self.get_state(full=False).copy()
+        start = mark[1] - 1 if mark[1] else 0
+        state['gantt_chart'] = self.gantt_chart[start:]
+        state['gantt_from'] = start
+        state['base_version'] = version
+        return state
     
     def get_statistics(self) -> dict:
         """
@@ -493,8 +802,11 @@ class SchedulerManager:
         - Avg Response Time:   Promedio de tiempo hasta primera ejecucion
         - Throughput:          Procesos completados por unidad de tiempo
         - CPU Utilization:     Porcentaje de tiempo que CPU estuvo ocupada
+        
+        Las sumas se mantienen al agregar, quitar y completar procesos,
+        asi que el calculo no recorre la lista de procesos.
         """
-        completed = self.process_queue.get_completed_processes()
+        completed = self.process_queue.count(ProcessState.COMPLETED)
         
         if not completed:
             return {
@@ -507,20 +819,15 @@ class SchedulerManager:
                 'total_count': len(self.process_queue)
             }
         
-        total_waiting = sum(p.waiting_time for p in completed)
-        total_turnaround = sum(p.turnaround_time for p in completed)
-        total_response = sum(p.response_time or 0 for p in completed)
-        
         # CPU utilization = tiempo ejecutando / tiempo total
-        total_burst = sum(p.burst_time for p in self.process_queue.processes)
-        cpu_util = (total_burst / self.current_time * 100) if self.current_time > 0 else 0
+        cpu_util = (self._sum_burst / self.current_time * 100) if self.current_time > 0 else 0
         
         return {
-            'avg_waiting_time': total_waiting / len(completed),
-            'avg_turnaround_time': total_turnaround / len(completed),
-            'avg_response_time': total_response / len(completed),
-            'throughput': len(completed) / self.current_time if self.current_time > 0 else 0,
+            'avg_waiting_time': self._sum_wait / completed,
+            'avg_turnaround_time': self._sum_turnaround / completed,
+            'avg_response_time': self._sum_response / completed,
+            'throughput': completed / self.current_time if self.current_time > 0 else 0,
             'cpu_utilization': min(cpu_util, 100),
-            'completed_count': len(completed),
+            'completed_count': completed,
             'total_count': len(self.process_queue)
         }
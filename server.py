@@ -3,17 +3,17 @@ server.py - Servidor TCP del Simulador de Scheduling
 
 Componente principal del backend que:
 1. Escucha conexiones TCP en localhost:5555
-2. Maneja multiples clientes con threading
+2. Maneja multiples clientes con un selector (epoll/kqueue/select)
 3. Ejecuta el loop de simulacion
 4. Broadcast del estado a todos los clientes conectados
 
 Arquitectura:
-- Thread principal: acepta conexiones entrantes
-- Thread por cliente: recibe y procesa mensajes
+- Thread principal: un solo loop de selector acepta conexiones y
+  recibe/procesa los mensajes de todos los clientes
 - Thread de simulacion: ejecuta ticks periodicos
 
 Protocolo:
-- Mensajes JSON delimitados por newline
+- Mensajes JSON con prefijo de longitud
 - Cliente envia comandos (ADD, START, PAUSE, ALGO, etc.)
 - Servidor responde con STATE_UPDATE
 
@@ -22,19 +22,61 @@ Proyecto: Simulador de Scheduling de CPU
 Materia: Sistemas Operativos - UABC 2025
 """
 
+import itertools
+import queue
+import selectors
 import socket
 import threading
-import json
 import time
 import signal
 import sys
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
-from config import SERVER_HOST, SERVER_PORT, MAX_CLIENTS, BUFFER_SIZE, MSG_TYPES
-from protocol import Message, Protocol, MessageBuffer
+from config import (SERVER_HOST, SERVER_PORT, MAX_CLIENTS, BUFFER_SIZE, MAX_FRAME_SIZE,
+                    SOCKET_BUFFER_SIZE, KEEPALIVE_IDLE, LOG_QUEUE_SIZE, MSG_TYPES)
+from protocol import Message, Protocol, MessageBuffer, ProtocolError
 from scheduling_algorithms import SchedulerManager
 from process import Process
 
+# sendmsg() no existe en todas las plataformas (ej: Windows)
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+# Acciones que retornan los handlers de mensajes
+_BROADCAST = 'broadcast'
+_REPLY = 'reply'
+_DISCONNECT = 'disconnect'
+
+
+def _write_frame(sock: socket.socket, views: List[memoryview]) -> List[memoryview]:
+    """
+    Escribe todo lo que acepte el kernel de un frame en un socket non-blocking.
+    
+    Con sendmsg() las partes del frame salen en una sola llamada (gather),
+    sin concatenarlas antes en un buffer nuevo; sin sendmsg() se envian
+    parte por parte.
+    
+    Args:
+        sock:  Socket non-blocking del cliente
+        views: Partes pendientes del frame (se modifica en su lugar)
+        
+    Returns:
+        Las partes que faltan por enviar (vacia si el frame salio completo)
+    """
+    while views:
+        try:
+            sent = sock.sendmsg(views) if _HAS_SENDMSG else sock.send(views[0])
+        except (BlockingIOError, InterruptedError):
+            break
+        # Descartar las partes ya enviadas y recortar la parcial
+        while sent:
+            first = len(views[0])
+            if sent < first:
+                views[0] = views[0][sent:]
+                break
+            sent -= first
+            del views[0]
+    return views
+
 
 class SchedulingServer:
     """
@@ -47,12 +89,19 @@ class SchedulingServer:
     - Sincronizar estado entre todos los clientes conectados
     
     Threading model:
-    - Main thread:       Acepta conexiones (blocking con timeout)
-    - Client threads:    Un thread por cliente para recv()
+    - Main thread:       Loop de selector: accept() y recv() de todos
+                         los clientes, sin un thread por conexion
     - Simulation thread: Ejecuta ticks cada 500ms
+    - Log thread:        Imprime los mensajes encolados con _log()
     
     Sincronizacion:
-    - self.lock protege acceso a clients dict y scheduler
+    - self.lock protege acceso a clients dict y scheduler; dentro solo se
+      muta el scheduler y se toma una instantanea (bytes + clientes)
+    - self._send_lock serializa los envios, que se hacen fuera de
+      self.lock para que un cliente lento no bloquee los comandos
+    - Los sockets de clientes son non-blocking: lo que un cliente no
+      acepta queda en su _outbox y el loop del selector lo termina de
+      enviar cuando el socket es escribible, sin frenar a los demas
     - _shutdown_event coordina shutdown limpio de todos los threads
     """
     
@@ -70,17 +119,65 @@ class SchedulingServer:
         
         # Diccionario de clientes: client_id -> socket
         self.clients: Dict[str, socket.socket] = {}
+        # Copia inmutable de clients.items() que se reemplaza (con self.lock)
+        # en cada alta/baja; los broadcasts la recorren sin copiar el dict
+        self._clients_view: Tuple[Tuple[str, socket.socket], ...] = ()
         self.client_buffers: Dict[str, MessageBuffer] = {}
         
+        # Selector del loop principal (socket del servidor + clientes) y
+        # buffer de recepcion compartido: solo ese loop llama recv_into()
+        self._sel = selectors.DefaultSelector()
+        self._recv_buf = bytearray(BUFFER_SIZE)
+        self._recv_view = memoryview(self._recv_buf)
+        # Par de sockets con el que stop() despierta al select() en curso
+        self._wakeup_r: Optional[socket.socket] = None
+        self._wakeup_w: Optional[socket.socket] = None
+        
         # Motor de scheduling
         self.scheduler = SchedulerManager()
         
         # Control de estado
         self.running = False
         self.lock = threading.Lock()
-        self._next_pid = 1
+        self._send_lock = threading.Lock()
+        # scheduler.version del ultimo estado enviado (o en envio) a cada
+        # cliente, para no mandarle uno mas viejo si dos envios se cruzan
+        self._sent_versions: Dict[str, int] = {}
+        # Frame a medio enviar de cada cliente lento, y clientes a los que
+        # se les descarto un estado mientras tanto: al vaciarse su _outbox
+        # reciben el estado completo actual (gana el mas reciente)
+        self._outbox: Dict[str, List[memoryview]] = {}
+        self._stale: Set[str] = set()
+        # Generador de PIDs (next() es una sola llamada en C)
+        self._pid_gen = itertools.count(1)
+        # scheduler.version del ultimo broadcast: el siguiente se envia
+        # como delta respecto a el (ver SchedulerManager.get_delta_since)
+        self._broadcast_version: Optional[int] = None
+        # Tabla de dispatch: tipo de mensaje -> handler
+        self._handlers = {
+            MSG_TYPES['ADD_PROCESS']: self._handle_add,
+            MSG_TYPES['REMOVE_PROCESS']: self._handle_remove,
+            MSG_TYPES['START_SIM']: self._handle_start,
+            MSG_TYPES['PAUSE_SIM']: self._handle_pause,
+            MSG_TYPES['RESET_SIM']: self._handle_reset,
+            MSG_TYPES['SET_ALGORITHM']: self._handle_set_algorithm,
+            MSG_TYPES['SET_QUANTUM']: self._handle_set_quantum,
+            MSG_TYPES['GET_STATE']: self._handle_get_state,
+            MSG_TYPES['TICK']: self._handle_tick,
+            MSG_TYPES['DISCONNECT']: self._handle_disconnect,
+        }
+        # Ultimo STATE_UPDATE serializado, completo (True) y delta (False):
+        # (scheduler.version, version base del delta, partes del frame)
+        self._state_bytes: Dict[bool, Tuple[int, Optional[int], Tuple[bytes, ...]]] = {}
         self._sim_thread: Optional[threading.Thread] = None
         self._shutdown_event = threading.Event()
+        self._stopped = False
+        
+        # Logs del camino de mensajes: se encolan y un thread aparte los
+        # imprime, para que una terminal lenta no frene al servidor
+        # mientras tiene self.lock. Si la cola se llena se descartan
+        self._log_q: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_thread: Optional[threading.Thread] = None
         
     def start(self):
         """
@@ -89,18 +186,20 @@ class SchedulingServer:
         Proceso:
         1. Crear socket TCP y bindear al puerto
         2. Iniciar thread de simulacion
-        3. Loop infinito aceptando conexiones
-        4. Por cada conexion, spawn thread de manejo
+        3. Loop del selector: aceptar conexiones y atender a los clientes
+           que tengan datos pendientes
         """
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
-        # Timeout permite verificar shutdown periodicamente
-        self.server_socket.settimeout(1.0)
+        self.server_socket.setblocking(False)
         
         try:
             self.server_socket.bind((self.host, self.port))
             self.server_socket.listen(MAX_CLIENTS)
+            self._sel.register(self.server_socket, selectors.EVENT_READ)
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+            self._wakeup_w.setblocking(False)
+            self._sel.register(self._wakeup_r, selectors.EVENT_READ)
             self.running = True
             
             print(f"""
@@ -114,6 +213,13 @@ class SchedulingServer:
 ========================================================
             """)
             
+            self._log_thread = threading.Thread(
+                target=self._log_loop,
+                daemon=True,
+                name="LogThread"
+            )
+            self._log_thread.start()
+            
             # Thread de simulacion ejecuta ticks periodicos
             self._sim_thread = threading.Thread(
                 target=self._simulation_loop, 
@@ -122,38 +228,31 @@ class SchedulingServer:
             )
             self._sim_thread.start()
             
-            # Loop principal: aceptar conexiones
+            # Loop principal. stop() y los envios pendientes lo despiertan
+            # con _wakeup_w y el timeout es solo un respaldo; data es el
+            # client_id para los clientes y None para el socket del
+            # servidor y el de wakeup
             while self.running and not self._shutdown_event.is_set():
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    client_id = f"{address[0]}:{address[1]}"
-                    
-                    with self.lock:
-                        self.clients[client_id] = client_socket
-                        self.client_buffers[client_id] = MessageBuffer()
-                    
-                    print(f"[+] Cliente conectado: {client_id}")
-                    
-                    # Thread dedicado para este cliente
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_id, client_socket),
-                        daemon=True,
-                        name=f"Client-{client_id}"
-                    )
-                    client_thread.start()
-                    
-                except socket.timeout:
-                    # Timeout normal, verificar condiciones de shutdown
-                    continue
-                except socket.error as e:
-                    if self.running and not self._shutdown_event.is_set():
-                        print(f"[!] Error aceptando conexion: {e}")
+                for key, mask in self._sel.select(timeout=1.0):
+                    client_id = key.data
+                    if client_id is not None:
+                        if mask & selectors.EVENT_WRITE:
+                            self._flush_client(client_id, key.fileobj)
+                        if mask & selectors.EVENT_READ:
+                            self._read_client(client_id, key.fileobj)
+                    elif key.fileobj is self.server_socket:
+                        self._accept_clients()
+                    else:
+                        self._wakeup_r.recv(BUFFER_SIZE)
                         
         except Exception as e:
             print(f"[!] Error iniciando servidor: {e}")
         finally:
             self.stop()
+            self._sel.close()
+            for sock in (self._wakeup_r, self._wakeup_w):
+                if sock is not None:
+                    sock.close()
     
     def stop(self):
         """
@@ -163,20 +262,29 @@ class SchedulingServer:
         2. Cierra sockets de clientes
         3. Cierra socket del servidor
         """
-        if self._shutdown_event.is_set():
+        if self._stopped:
             return
+        self._stopped = True
+        
+        self.request_stop()
         
+        # Vaciar los logs pendientes antes de imprimir directo
+        if self._log_thread is not None:
+            try:
+                self._log_q.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._log_thread.join(timeout=1.0)
         print("\n[*] Deteniendo servidor...")
-        self._shutdown_event.set()
-        self.running = False
         
         with self.lock:
-            for client_id, client_socket in list(self.clients.items()):
+            for client_id, client_socket in self._clients_view:
                 try:
                     client_socket.close()
                 except:
                     pass
             self.clients.clear()
+            self._clients_view = ()
         
         if self.server_socket:
             try:
@@ -186,55 +294,154 @@ class SchedulingServer:
         
         print("[*] Servidor detenido")
     
-    def _handle_client(self, client_id: str, client_socket: socket.socket):
+    def request_stop(self):
         """
-        Maneja la comunicacion con un cliente especifico.
+        Pide al loop principal que termine, sin cerrar nada.
         
-        Este metodo corre en un thread dedicado por cliente.
+        Seguro de llamar desde un signal handler: no toma self.lock (el
+        handler corre en el thread principal, que puede estar dentro de
+        _process_message con el lock tomado). El cierre de sockets lo hace
+        stop() cuando start() sale del loop.
+        """
+        self._shutdown_event.set()
+        self.running = False
+        self._wake()
+    
+    def _wake(self):
+        """Despierta al loop del selector si esta esperando en select()."""
+        if self._wakeup_w is not None:
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                # Cola llena (ya hay un wakeup pendiente) o socket cerrado
+                pass
+    
+    def _log(self, msg: str):
+        """Encola un mensaje de log sin bloquear (se descarta si la cola esta llena)."""
+        try:
+            self._log_q.put_nowait(msg)
+        except queue.Full:
+            pass
+    
+    def _log_loop(self):
+        """Imprime los mensajes de _log() en orden; termina con None."""
+        while True:
+            msg = self._log_q.get()
+            if msg is None:
+                break
+            print(msg)
+    
+    def _accept_clients(self):
+        """
+        Acepta todas las conexiones pendientes y las registra en el selector.
+        
+        El socket del servidor es non-blocking: se llama accept() hasta
+        vaciar la cola del listen, de modo que una rafaga de conexiones se
+        atiende en una sola vuelta del loop y con un solo paso por el lock.
+        
+        Los sockets de clientes quedan en modo non-blocking: se leen
+        cuando el selector indica que hay datos, y lo que no se alcanza a
+        enviar se termina cuando el selector indica que son escribibles.
+        """
+        accepted = []
+        while True:
+            try:
+                client_socket, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            except socket.error as e:
+                if self.running and not self._shutdown_event.is_set():
+                    self._log(f"[!] Error aceptando conexion: {e}")
+                break
+            client_socket.setblocking(False)
+            self._tune_client_socket(client_socket)
+            accepted.append((f"{address[0]}:{address[1]}", client_socket))
+        
+        if not accepted:
+            return
+        
+        with self.lock:
+            for client_id, client_socket in accepted:
+                self.clients[client_id] = client_socket
+                self.client_buffers[client_id] = MessageBuffer(MAX_FRAME_SIZE)
+                self._sel.register(client_socket, selectors.EVENT_READ, client_id)
+            self._clients_view = tuple(self.clients.items())
+            version = self.scheduler.version
+            state = self._encoded_state()
+        
+        for client_id, _ in accepted:
+            self._log(f"[+] Cliente conectado: {client_id}")
+        
+        # Enviar estado inicial: el mismo buffer para toda la rafaga
+        self._send_state(version, state, accepted)
+    
+    @staticmethod
+    def _tune_client_socket(client_socket: socket.socket):
+        """
+        Ajusta las opciones de un socket de cliente recien aceptado.
+        
+        - TCP_NODELAY: los STATE_UPDATE son frames chicos y sensibles a
+          la latencia; sin Nagle salen en cuanto se envian
+        - SO_SNDBUF/SO_RCVBUF: espacio para varios estados completos, asi
+          rara vez queda un frame pendiente en _outbox
+        - SO_KEEPALIVE: un cliente que desaparecio sin cerrar la conexion
+          se detecta en segundos (donde el SO permite ajustar los tiempos)
+          en vez de seguir recibiendo broadcasts
+        """
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for name, value in (('TCP_KEEPIDLE', KEEPALIVE_IDLE),
+                            ('TCP_KEEPINTVL', KEEPALIVE_IDLE),
+                            ('TCP_KEEPCNT', 3)):
+            option = getattr(socket, name, None)
+            if option is not None:
+                client_socket.setsockopt(socket.IPPROTO_TCP, option, value)
+    
+    def _read_client(self, client_id: str, client_socket: socket.socket):
+        """
+        Atiende a un cliente que el selector reporto con datos.
         
-        Loop:
-        1. Recibir datos del socket
+        1. Recibir datos del socket (no bloquea: ya hay datos)
         2. Parsear mensajes con MessageBuffer
         3. Procesar cada mensaje
-        4. Terminar si desconexion o error
+        4. Desconectar si el cliente cerro, hubo error o pidio DISCONNECT
         
         Args:
             client_id:     Identificador del cliente (ip:port)
             client_socket: Socket TCP del cliente
         """
-        buffer = self.client_buffers[client_id]
-        
-        # Enviar estado inicial al conectarse
-        self._send_to_client(client_id, Protocol.state_update(self.scheduler.get_state()))
+        buffer = self.client_buffers.get(client_id)
+        if buffer is None:
+            # Desconectado por otro thread (ej: fallo un broadcast)
+            return
         
         try:
-            while self.running:
-                try:
-                    data = client_socket.recv(BUFFER_SIZE)
-                    if not data:
-                        # Conexion cerrada por el cliente
-                        break
-                    
-                    # Parsear mensajes del stream TCP
-                    messages = buffer.add_data(data)
-                    should_continue = True
-                    
-                    for msg in messages:
-                        result = self._process_message(client_id, msg)
-                        if result is False:
-                            # Cliente solicito desconexion (BYE)
-                            should_continue = False
-                            break
-                    
-                    if not should_continue:
-                        break
-                        
-                except socket.error:
-                    break
+            try:
+                n = client_socket.recv_into(self._recv_buf)
+            except (BlockingIOError, InterruptedError):
+                # Aviso espurio del selector: no habia datos
+                return
+            if not n:
+                # Conexion cerrada por el cliente
+                self._disconnect_client(client_id)
+                return
+            
+            # Parsear mensajes del stream TCP
+            for msg in buffer.add_data(self._recv_view[:n]):
+                if self._process_message(client_id, msg) is False:
+                    # Cliente solicito desconexion (BYE)
+                    self._disconnect_client(client_id)
+                    return
                     
+        except socket.error:
+            self._disconnect_client(client_id)
+        except ProtocolError as e:
+            self._log(f"[!] Mensaje invalido de {client_id}: {e}")
+            self._disconnect_client(client_id)
         except Exception as e:
-            print(f"[!] Error con cliente {client_id}: {e}")
-        finally:
+            self._log(f"[!] Error con cliente {client_id}: {e}")
             self._disconnect_client(client_id)
     
     def _process_message(self, client_id: str, msg: Message):
@@ -253,80 +460,97 @@ class SchedulingServer:
         - TICK:           Tick manual (debug)
         - DISCONNECT:     Cliente quiere desconectarse
         
+        El tipo se despacha con una sola busqueda en self._handlers.
+        
         Returns:
             False si el cliente quiere desconectarse, True en otro caso
         """
         msg_type = msg.type
-        data = msg.data
         
-        print(f"[<] {client_id}: {msg_type}")
+        self._log(f"[<] {client_id}: {msg_type}")
         
+        handler = self._handlers.get(msg_type)
+        if handler is None:
+            return True
+        
+        # El handler corre con el lock; el estado se envia despues de soltarlo
         with self.lock:
-            if msg_type == MSG_TYPES['ADD_PROCESS']:
-                process = Process(
-                    pid=self._next_pid,
-                    name=data.get('name', f'P{self._next_pid}'),
-                    burst_time=data.get('burst_time', 5),
-                    arrival_time=data.get('arrival_time', self.scheduler.current_time),
-                    priority=data.get('priority', 5)
-                )
-                self.scheduler.add_process(process)
-                self._next_pid += 1
-                print(f"    [+] Proceso agregado: {process}")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['REMOVE_PROCESS']:
-                pid = data.get('pid')
-                if self.scheduler.remove_process(pid):
-                    print(f"    [-] Proceso {pid} removido")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['START_SIM']:
-                self.scheduler.start()
-                print("    [>] Simulacion iniciada")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['PAUSE_SIM']:
-                if self.scheduler.is_paused:
-                    self.scheduler.resume()
-                    print("    [>] Simulacion reanudada")
-                else:
-                    self.scheduler.pause()
-                    print("    [||] Simulacion pausada")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['RESET_SIM']:
-                self.scheduler.reset()
-                self._next_pid = 1
-                print("    [R] Simulacion reiniciada")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['SET_ALGORITHM']:
-                algo = data.get('algorithm', 'FCFS')
-                if self.scheduler.set_algorithm(algo):
-                    print(f"    [*] Algoritmo cambiado a: {algo}")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['SET_QUANTUM']:
-                quantum = data.get('quantum', 2)
-                self.scheduler.set_quantum(quantum)
-                print(f"    [*] Quantum establecido a: {quantum}")
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['GET_STATE']:
-                self._send_to_client(client_id, Protocol.state_update(self.scheduler.get_state()))
-                
-            elif msg_type == MSG_TYPES['TICK']:
-                self.scheduler.tick()
-                self._broadcast_state()
-                
-            elif msg_type == MSG_TYPES['DISCONNECT']:
-                # Retornar False indica al caller que debe terminar el loop
-                # No llamar _disconnect_client aqui porque tenemos el lock
-                return False
+            action = handler(msg.data)
         
+        if action is _BROADCAST:
+            self._broadcast_state()
+        elif action is _REPLY:
+            self._send_full_state(client_id)
+        elif action is _DISCONNECT:
+            # No llamar _disconnect_client con el lock: lo hace el caller
+            return False
         return True
     
+    # ==================== Handlers de mensajes ====================
+    # Se llaman con self.lock tomado y retornan la accion a realizar
+    # despues de soltarlo (_BROADCAST, _REPLY o _DISCONNECT)
+    
+    def _handle_add(self, data: dict):
+        pid = next(self._pid_gen)
+        process = Process(
+            pid=pid,
+            name=data.get('name', f'P{pid}'),
+            burst_time=data.get('burst_time', 5),
+            arrival_time=data.get('arrival_time', self.scheduler.current_time),
+            priority=data.get('priority', 5)
+        )
+        self.scheduler.add_process(process)
+        self._log(f"    [+] Proceso agregado: {process}")
+        return _BROADCAST
+    
+    def _handle_remove(self, data: dict):
+        pid = data.get('pid')
+        if self.scheduler.remove_process(pid):
+            self._log(f"    [-] Proceso {pid} removido")
+        return _BROADCAST
+    
+    def _handle_start(self, data: dict):
+        self.scheduler.start()
+        self._log("    [>] Simulacion iniciada")
+        return _BROADCAST
+    
+    def _handle_pause(self, data: dict):
+        if self.scheduler.is_paused:
+            self.scheduler.resume()
+            self._log("    [>] Simulacion reanudada")
+        else:
+            self.scheduler.pause()
+            self._log("    [||] Simulacion pausada")
+        return _BROADCAST
+    
+    def _handle_reset(self, data: dict):
+        self.scheduler.reset()
+        self._pid_gen = itertools.count(1)
+        self._log("    [R] Simulacion reiniciada")
+        return _BROADCAST
+    
+    def _handle_set_algorithm(self, data: dict):
+        algo = data.get('algorithm', 'FCFS')
+        if self.scheduler.set_algorithm(algo):
+            self._log(f"    [*] Algoritmo cambiado a: {algo}")
+        return _BROADCAST
+    
+    def _handle_set_quantum(self, data: dict):
+        quantum = data.get('quantum', 2)
+        self.scheduler.set_quantum(quantum)
+        self._log(f"    [*] Quantum establecido a: {quantum}")
+        return _BROADCAST
+    
+    def _handle_get_state(self, data: dict):
+        return _REPLY
+    
+    def _handle_tick(self, data: dict):
+        self.scheduler.step()
+        return _BROADCAST
+    
+    def _handle_disconnect(self, data: dict):
+        return _DISCONNECT
+    
     def _simulation_loop(self):
         """
         Loop de simulacion que ejecuta ticks periodicos.
@@ -335,27 +559,159 @@ class SchedulingServer:
         1. Verifica si la simulacion esta activa
         2. Ejecuta un tick del scheduler
         3. Broadcast del nuevo estado a clientes
+        
+        Los ticks se programan contra un deadline de time.monotonic() en
+        lugar de dormir 500ms despues de cada uno, asi el tiempo que toma
+        el tick no se acumula como deriva. La espera es sobre
+        _shutdown_event, de modo que stop() no espera al siguiente tick.
         """
         tick_interval = 0.5
+        next_deadline = time.monotonic() + tick_interval
         
         while self.running:
-            time.sleep(tick_interval)
+            if self._shutdown_event.wait(max(0.0, next_deadline - time.monotonic())):
+                break
+            next_deadline += tick_interval
+            # Si el loop se atraso (ej: un broadcast lento) se omiten los
+            # ticks perdidos en vez de ejecutarlos en rafaga
+            now = time.monotonic()
+            if next_deadline < now:
+                next_deadline = now + tick_interval
             
+            advanced = False
             with self.lock:
                 if self.scheduler.is_running and not self.scheduler.is_paused:
                     old_time = self.scheduler.current_time
-                    self.scheduler.tick()
-                    
-                    if self.scheduler.current_time != old_time:
-                        self._broadcast_state()
+                    self.scheduler.step()
+                    advanced = self.scheduler.current_time != old_time
+            
+            if advanced:
+                self._broadcast_state()
     
-    def _send_to_client(self, client_id: str, msg: Message):
-        """Envia un mensaje a un cliente especifico."""
-        if client_id in self.clients:
+    def _encoded_state(self, since: Optional[int] = None) -> Tuple[bytes, ...]:
+        """
+        Retorna el STATE_UPDATE del estado actual ya serializado, en las
+        partes de Protocol.state_update_parts(); _write_frame las envia
+        juntas con sendmsg() sin concatenarlas.
+        
+        Args:
+            since: Si se da, version base para enviar el estado como delta
+                   (get_delta_since); si el scheduler ya no la acepta, o si
+                   es None, se envia el estado completo
+        
+        Los bytes se reutilizan mientras scheduler.version no cambie, asi
+        que los comandos que no modifican nada y los clientes que se
+        conectan entre dos ticks no vuelven a armar ni serializar el
+        estado. Debe llamarse con self.lock tomado.
+        """
+        version = self.scheduler.version
+        full = since is None
+        cached = self._state_bytes.get(full)
+        if cached is not None and cached[0] == version and cached[1] == since:
+            return cached[2]
+        
+        state = None if full else self.scheduler.get_delta_since(since)
+        if state is None:
+            full = True
+            state = self.scheduler.get_state()
+        data = Protocol.state_update_parts(state)
+        self._state_bytes[full] = (version, None if full else since, data)
+        return data
+    
+    def _send_full_state(self, client_id: str):
+        """Envia el estado completo a un cliente especifico."""
+        with self.lock:
+            client_socket = self.clients.get(client_id)
+            if client_socket is None:
+                return
+            version = self.scheduler.version
+            state = self._encoded_state()
+        self._send_state(version, state, [(client_id, client_socket)])
+    
+    def _send_state(self, version: int, state: Tuple[bytes, ...],
+                    clients: Sequence[Tuple[str, socket.socket]]):
+        """
+        Envia un STATE_UPDATE ya serializado a los clientes dados.
+        
+        Corre sin self.lock: state y clients son una instantanea tomada
+        con el lock. Los envios se serializan con _send_lock para que los
+        frames de dos threads no se intercalen en un mismo socket, y a un
+        cliente que ya recibio una version mas nueva no se le envia esta.
+        
+        Ningun envio espera a un cliente: lo que su socket no acepta queda
+        en _outbox para el loop del selector. Si ese cliente aun tiene un
+        frame pendiente, este estado se descarta y se marca en _stale.
+        """
+        disconnected = []
+        wake = False
+        
+        with self._send_lock:
+            sent_versions = self._sent_versions
+            outbox = self._outbox
+            for client_id, client_socket in clients:
+                if sent_versions.get(client_id, -1) > version:
+                    continue
+                if client_id in outbox:
+                    self._stale.add(client_id)
+                    continue
+                try:
+                    pending = _write_frame(client_socket, [memoryview(p) for p in state])
+                except socket.error:
+                    disconnected.append(client_id)
+                    continue
+                sent_versions[client_id] = version
+                if pending:
+                    outbox[client_id] = pending
+                    wake |= self._watch_writable(client_id, client_socket, True)
+        
+        if wake:
+            self._wake()
+        for client_id in disconnected:
+            self._disconnect_client(client_id)
+    
+    def _watch_writable(self, client_id: str, client_socket: socket.socket,
+                        enable: bool) -> bool:
+        """Activa o quita EVENT_WRITE del cliente en el selector; False si ya no esta."""
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if enable else selectors.EVENT_READ
+        try:
+            self._sel.modify(client_socket, events, client_id)
+        except (KeyError, ValueError):
+            # Desconectado mientras tanto
+            return False
+        return True
+    
+    def _flush_client(self, client_id: str, client_socket: socket.socket):
+        """
+        Continua el envio pendiente de un cliente cuyo socket es escribible.
+        
+        Corre en el loop del selector. Cuando el frame pendiente termina,
+        si mientras tanto se descarto algun estado para este cliente se le
+        envia el estado completo actual (un delta intermedio ya no le
+        serviria); si no, deja de vigilar EVENT_WRITE.
+        """
+        with self._send_lock:
+            pending = self._outbox.get(client_id)
+            if pending is None:
+                return
             try:
-                self.clients[client_id].send(msg.to_bytes())
+                pending = _write_frame(client_socket, pending)
             except socket.error:
-                self._disconnect_client(client_id)
+                pending = None
+            if pending:
+                return
+            del self._outbox[client_id]
+            stale = client_id in self._stale
+            self._stale.discard(client_id)
+            if not stale and pending is not None:
+                self._watch_writable(client_id, client_socket, False)
+        
+        if pending is None:
+            self._disconnect_client(client_id)
+        elif stale:
+            self._send_full_state(client_id)
+            with self._send_lock:
+                if client_id not in self._outbox:
+                    self._watch_writable(client_id, client_socket, False)
     
     def _broadcast_state(self):
         """
@@ -367,31 +723,54 @@ class SchedulingServer:
         - Proceso en ejecucion
         - Gantt chart
         - Estadisticas
-        """
-        state_msg = Protocol.state_update(self.scheduler.get_state())
-        disconnected = []
         
-        for client_id, client_socket in list(self.clients.items()):
-            try:
-                client_socket.send(state_msg.to_bytes())
-            except socket.error:
-                disconnected.append(client_id)
+        Si no hubo altas/bajas de procesos ni reset desde el ultimo
+        broadcast, el estado se envia como delta respecto a el: los procesos
+        solo con sus campos mutables y el Gantt solo con las entradas
+        nuevas o extendidas. Un cliente que no tenga esa base pide el estado
+        completo con GET_STATE. Todos los clientes reciben el mismo frame
+        (ver _send_state): _write_frame escribe lo que el kernel acepte y
+        el resto queda en _outbox del cliente, que el loop del selector
+        termina de enviar. Si llega otro estado mientras ese cliente tiene
+        un frame pendiente, se descarta para el y se marca en _stale; al
+        vaciarse su _outbox recibe el estado completo actual.
         
-        for client_id in disconnected:
-            self._disconnect_client(client_id)
+        Si scheduler.version no cambio desde el ultimo broadcast no se envia
+        nada: los clientes ya tienen ese estado.
+        
+        Solo la instantanea se toma con self.lock; el envio es fuera de el
+        (ver _send_state), asi que no debe llamarse con el lock tomado.
+        """
+        with self.lock:
+            version = self.scheduler.version
+            if version == self._broadcast_version:
+                # Comando sin efecto (ej: mismo quantum): nada que enviar
+                return
+            state = self._encoded_state(self._broadcast_version)
+            self._broadcast_version = version
+            clients = self._clients_view
+        self._send_state(version, state, clients)
     
     def _disconnect_client(self, client_id: str):
         """Desconecta un cliente y limpia sus recursos."""
         with self.lock:
             if client_id in self.clients:
+                try:
+                    self._sel.unregister(self.clients[client_id])
+                except (KeyError, ValueError):
+                    pass
                 try:
                     self.clients[client_id].close()
                 except:
                     pass
                 del self.clients[client_id]
+                self._clients_view = tuple(self.clients.items())
+                self._sent_versions.pop(client_id, None)
+                self._outbox.pop(client_id, None)
+                self._stale.discard(client_id)
                 if client_id in self.client_buffers:
                     del self.client_buffers[client_id]
-                print(f"[-] Cliente desconectado: {client_id}")
+                self._log(f"[-] Cliente desconectado: {client_id}")
 
 
 def main():
@@ -399,10 +778,8 @@ def main():
     server = SchedulingServer()
     
     def signal_handler(sig, frame):
-        """Maneja Ctrl+C para shutdown limpio."""
-        server.stop()
-        import os
-        os._exit(0)
+        """Maneja Ctrl+C para shutdown limpio (start() hace el cierre)."""
+        server.request_stop()
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -30,6 +30,8 @@ Materia: Sistemas Operativos - UABC 2025
 
 import pygame
 import os
+from bisect import bisect_right
+from operator import itemgetter
 
 # Suprimir mensaje de bienvenida de pygame
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
@@ -37,10 +39,32 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 from typing import List, Dict, Optional, Tuple
 from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, COLORS, PROCESS_COLORS, 
-    ALGORITHMS, FPS
+    ALGORITHMS, TEXT_CACHE_SIZE, TICK_LABELS
 )
 
 
+# Columnas de la tabla de procesos (la primera es el indicador de color)
+_TABLE_HEADERS = ['', 'PID', 'Nombre', 'Burst', 'Lleg', 'Pri', 'Rest', 'Estado']
+_TABLE_COLUMN_WIDTHS = [12, 35, 65, 45, 40, 35, 40, 70]
+_TABLE_MAX_ROWS = 6
+_TABLE_ROW_HEIGHT = 22
+# Esquina superior izquierda del area de filas (borde del panel, 1a fila)
+_TABLE_ROWS_POS = (20, 115 + 55)
+
+# Llave de busqueda en el Gantt: tiempo de fin de cada (pid, start, end)
+_SEGMENT_END = itemgetter(2)
+
+# Tamano de los botones de algoritmo
+_BUTTON_WIDTH = 90
+_BUTTON_HEIGHT = 28
+
+
+def _centered(surface: pygame.Surface, cx: int, cy: int) -> Tuple[int, int]:
+    """Esquina superior izquierda para centrar surface en (cx, cy), sin crear un Rect."""
+    w, h = surface.get_size()
+    return (cx - w // 2, cy - h // 2)
+
+
 class Renderer:
     """
     Clase principal de renderizado con PyGame.
@@ -49,10 +73,10 @@ class Renderer:
     - Inicializar PyGame y crear ventana
     - Renderizar cada seccion de la interfaz
     - Manejar fuentes y colores
-    - Controlar framerate
     
     El metodo render() es llamado cada frame por el cliente
-    y recibe el estado actual del servidor.
+    y recibe el estado actual del servidor. El ritmo de frames
+    (FPS) lo controla el loop del cliente.
     """
     
     def __init__(self, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT):
@@ -70,7 +94,11 @@ class Renderer:
         self.width = width
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
-        self.clock = pygame.time.Clock()
+        
+        # Solo se procesan teclado y cierre de ventana: el resto de eventos
+        # (movimiento del mouse, etc.) se descarta antes de encolarse
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
         
         # Sistema de fuentes con fallback
         self.font_title = pygame.font.SysFont('DejaVuSans', 28, bold=True)
@@ -78,10 +106,49 @@ class Renderer:
         self.font_small = pygame.font.SysFont('DejaVuSans', 14)
         self.font_tiny = pygame.font.SysFont('DejaVuSans', 12)
         
+        # Blits pendientes del frame: se hacen todos juntos al final de
+        # render() con una sola llamada (fblits en pygame-ce)
+        self._blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        self._fblits = getattr(self.screen, 'fblits', self.screen.blits)
+        
+        # Color de cada PID para el Gantt y la cola Ready, valido mientras
+        # no cambie roster_version (ver _update_pid_colors)
+        self._pid_colors: Dict[int, Tuple[int, int, int]] = {}
+        self._pid_colors_roster: Optional[int] = None
+        
+        # Etiquetas de las marcas de tiempo del Gantt (ver _tick_label)
+        self._tick_labels: List[Optional[pygame.Surface]] = [None] * TICK_LABELS
+        
+        # Strings ya formateados (ver _fmt)
+        self._fmt_cache: Dict[tuple, str] = {}
+        
+        # Etiqueta ya rasterizada de las barras del Gantt: pid -> Surface
+        self._gantt_labels: Dict[int, pygame.Surface] = {}
+        
+        # Rectangulos redondeados ya dibujados (ver _rounded_rect)
+        self._rect_cache: Dict[tuple, pygame.Surface] = {}
+        
+        # Botones de algoritmo ya dibujados: (algoritmo, seleccionado) -> Surface
+        self._button_cache: Dict[Tuple[str, bool], pygame.Surface] = {}
+        
+        # Cache de textos rasterizados: (font, texto, color) -> Surface
+        self._text_cache: Dict[Tuple[int, str, Tuple[int, int, int]], pygame.Surface] = {}
+        
         # Estado local para rendering
         self.quantum = 2
         self._frame_count = 0
         
+        # Todo lo que no depende del estado se dibuja una sola vez aqui y
+        # cada frame empieza copiando este fondo
+        self._static_bg = self._build_static_background()
+        
+        # Filas de la tabla de procesos: se conservan entre frames y solo se
+        # redibuja la fila cuyos valores cambiaron (ver _render_process_table)
+        rows_height = _TABLE_MAX_ROWS * _TABLE_ROW_HEIGHT + self.font_tiny.get_linesize()
+        self._table_surface = self._static_bg.subsurface(
+            (*_TABLE_ROWS_POS, 420, rows_height)).copy()
+        self._table_row_keys: List[Optional[tuple]] = [None] * (_TABLE_MAX_ROWS + 1)
+        
     def render(self, state: dict):
         """
         Renderiza un frame completo de la interfaz.
@@ -90,9 +157,10 @@ class Renderer:
             state: Estado de la simulacion desde el servidor
         """
         self._frame_count += 1
+        self._update_pid_colors(state)
         
-        # Limpiar pantalla
-        self.screen.fill(COLORS['background'])
+        # Fondo, paneles y textos fijos (reemplaza el fill de la pantalla)
+        self.screen.blit(self._static_bg, (0, 0))
         
         # Renderizar cada seccion
         self._render_header(state)
@@ -101,25 +169,152 @@ class Renderer:
         self._render_gantt_chart(state)
         self._render_cpu_visualization(state)
         self._render_statistics(state)
-        self._render_controls_help()
         
-        # Actualizar display y controlar FPS
+        # Los textos se dibujan despues de las figuras; ninguna seccion
+        # dibuja una figura encima de un texto, asi que el orden no cambia
+        # el resultado
+        self._fblits(self._blits)
+        self._blits.clear()
+        
+        # Actualizar display
         pygame.display.flip()
-        self.clock.tick(FPS)
+    
+    def _text(self, font: pygame.font.Font, text: str,
+              color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Retorna el Surface de un texto, rasterizandolo solo la primera vez.
+        
+        La mayoria de los textos (titulos, encabezados, nombres, PIDs) se
+        repiten frame a frame; font.render() es lo mas caro del frame, asi
+        que se guardan por (font, texto, color). Si el cache crece mas de
+        TEXT_CACHE_SIZE se vacia completo y se vuelve a llenar con los
+        textos que siguen en pantalla.
+        """
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            # En el formato de la ventana el blit no convierte cada pixel
+            surface = font.render(text, True, color).convert_alpha()
+            self._text_cache[key] = surface
+        return surface
+    
+    def _update_pid_colors(self, state: dict):
+        """
+        Reconstruye el mapeo PID -> color solo si cambio la lista de procesos.
+        
+        color_index se asigna al agregar el proceso y no cambia despues, y
+        roster_version del servidor cambia cada vez que se agrega o quita
+        uno, asi que el mapeo sirve mientras roster_version sea la misma.
+        Si el estado no trae roster_version se reconstruye cada frame.
+        """
+        roster = state.get('roster_version')
+        if roster is not None and roster == self._pid_colors_roster:
+            return
+        n = len(PROCESS_COLORS)
+        self._pid_colors = {
+            p['pid']: PROCESS_COLORS[p.get('color_index', p['pid']) % n]
+            for p in state.get('processes', [])
+        }
+        self._pid_colors_roster = roster
+    
+    def _tick_label(self, t: int) -> pygame.Surface:
+        """
+        Retorna la etiqueta de una marca de tiempo del Gantt.
+        
+        Las etiquetas 0..TICK_LABELS-1 se guardan en una lista indexada
+        por el tiempo, asi que no se arma ni el str ni la llave del cache
+        de textos; tiempos mayores usan el cache de textos normal.
+        """
+        if t < TICK_LABELS:
+            label = self._tick_labels[t]
+            if label is None:
+                label = self._tick_labels[t] = self._text(self.font_tiny, str(t), COLORS['text_dim'])
+            return label
+        return self._text(self.font_tiny, str(t), COLORS['text_dim'])
+    
+    def _fmt(self, template: str, *values) -> str:
+        """
+        Retorna template.format(*values), formateando solo la primera vez.
+        
+        Los valores mostrados (tiempos, promedios, contadores) cambian a lo
+        mas una vez por tick y se repiten entre frames; el string se guarda
+        por (template, valores) con el mismo limite que el cache de textos.
+        """
+        key = (template, values)
+        text = self._fmt_cache.get(key)
+        if text is None:
+            if len(self._fmt_cache) >= TEXT_CACHE_SIZE:
+                self._fmt_cache.clear()
+            text = template.format(*values)
+            self._fmt_cache[key] = text
+        return text
+    
+    def _build_static_background(self) -> pygame.Surface:
+        """
+        Dibuja en un Surface aparte las partes de la interfaz que no
+        dependen del estado.
+        
+        Incluye el fondo, titulos, separadores, paneles contenedores,
+        encabezados de la tabla, el fondo de la barra de CPU y la barra
+        de ayuda de controles. Los paneles con border_radius son de lo mas
+        caro de dibujar, asi que no tiene caso repetirlos cada frame.
+        """
+        bg = pygame.Surface((self.width, self.height)).convert()
+        bg.fill(COLORS['background'])
+        
+        # Header: titulo, panel de estado y separador horizontal
+        title = self._text(self.font_title, "Simulador de CPU Scheduling", COLORS['accent'])
+        bg.blit(title, (20, 12))
+        pygame.draw.rect(bg, COLORS['panel'], (self.width - 180, 10, 160, 25), border_radius=4)
+        pygame.draw.line(bg, COLORS['grid'], (20, 65), (self.width - 20, 65), 1)
+        
+        # Paneles contenedores con su titulo
+        panels = [
+            ((20, 115, 420, 180), "Procesos"),
+            ((460, 115, 720, 180), "Gantt Chart"),
+            ((20, 310, 420, 170), "CPU"),
+            ((460, 310, 720, 170), "Estadisticas"),
+        ]
+        for rect, label in panels:
+            pygame.draw.rect(bg, COLORS['panel'], rect, border_radius=8)
+            title = self._text(self.font_medium, label, COLORS['text'])
+            bg.blit(title, (rect[0] + 10, rect[1] + 8))
+        
+        # Encabezados de la tabla de procesos y linea separadora
+        x = 30
+        y = 115 + 35
+        for header, width in zip(_TABLE_HEADERS, _TABLE_COLUMN_WIDTHS):
+            text = self._text(self.font_tiny, header, COLORS['text_dim'])
+            bg.blit(text, (x, y))
+            x += width
+        pygame.draw.line(bg, COLORS['grid'], (25, y + 15), (420 + 15, y + 15), 1)
+        
+        # Etiqueta de la cola Ready
+        ready_label = self._text(self.font_small, "Ready Queue", COLORS['text'])
+        bg.blit(ready_label, (260, 310 + 40))
+        
+        # Fondo de la barra vertical de CPU
+        pygame.draw.rect(bg, COLORS['background'], (460 + 500, 310 + 45, 180, 100), border_radius=5)
+        
+        # Barra de ayuda de controles
+        help_rect = pygame.Rect(20, self.height - 45, self.width - 40, 35)
+        pygame.draw.rect(bg, COLORS['panel'], help_rect, border_radius=6)
+        controls = "[1-4] Algoritmo    [SPACE] Play/Pause    [A] Agregar    [R] Reset    [+/-] Quantum    [Q] Salir"
+        text = self._text(self.font_small, controls, COLORS['text_dim'])
+        bg.blit(text, text.get_rect(center=help_rect.center))
+        
+        return bg
     
     def _render_header(self, state: dict):
         """
         Renderiza el encabezado con titulo y estado.
         
-        Muestra:
-        - Titulo del simulador (izquierda)
+        Muestra (el titulo del simulador esta en el fondo estatico):
         - Estado actual: EJECUTANDO/PAUSADO/DETENIDO (derecha)
         - Tiempo de simulacion (derecha)
         """
-        # Titulo principal
-        title = self.font_title.render("Simulador de CPU Scheduling", True, COLORS['accent'])
-        self.screen.blit(title, (20, 12))
-        
         status_x = self.width - 180
         
         # Determinar estado y color
@@ -134,19 +329,13 @@ class Renderer:
             status = "DETENIDO"
             color = COLORS['text_dim']
         
-        # Panel de estado
-        status_rect = pygame.Rect(status_x, 10, 160, 25)
-        pygame.draw.rect(self.screen, COLORS['panel'], status_rect, border_radius=4)
-        status_text = self.font_medium.render(status, True, color)
-        status_text_rect = status_text.get_rect(center=status_rect.center)
-        self.screen.blit(status_text, status_text_rect)
+        # Texto sobre el panel de estado
+        status_text = self._text(self.font_medium, status, color)
+        self._blits.append((status_text, _centered(status_text, status_x + 80, 10 + 12)))
         
         # Tiempo actual
-        time_text = self.font_medium.render(f"T = {state.get('current_time', 0)}", True, COLORS['text'])
-        self.screen.blit(time_text, (status_x + 50, 40))
-        
-        # Separador horizontal
-        pygame.draw.line(self.screen, COLORS['grid'], (20, 65), (self.width - 20, 65), 1)
+        time_text = self._text(self.font_medium, self._fmt("T = {}", state.get('current_time', 0)), COLORS['text'])
+        self._blits.append((time_text, (status_x + 50, 40)))
     
     def _render_algorithm_selector(self, state: dict):
         """
@@ -178,25 +367,13 @@ class Renderer:
             # Verificar si este algoritmo esta seleccionado
             is_selected = current_algo in algo_map[algo] or current_algo == algo
             
-            btn_width = 90
-            rect = pygame.Rect(x, y_start, btn_width, 28)
+            button = self._button_cache.get((algo, is_selected))
+            if button is None:
+                button = self._build_button(f"{i+1}:{algo}", is_selected)
+                self._button_cache[(algo, is_selected)] = button
+            self._blits.append((button, (x, y_start)))
             
-            if is_selected:
-                # Boton activo: fondo de color accent
-                pygame.draw.rect(self.screen, COLORS['accent'], rect, border_radius=4)
-                text_color = COLORS['background']
-            else:
-                # Boton inactivo: fondo panel con borde
-                pygame.draw.rect(self.screen, COLORS['panel'], rect, border_radius=4)
-                pygame.draw.rect(self.screen, COLORS['grid'], rect, 1, border_radius=4)
-                text_color = COLORS['text']
-            
-            # Texto: "N:ALGO"
-            algo_text = self.font_small.render(f"{i+1}:{algo}", True, text_color)
-            text_rect = algo_text.get_rect(center=rect.center)
-            self.screen.blit(algo_text, text_rect)
-            
-            x += btn_width + 10
+            x += _BUTTON_WIDTH + 10
         
         # Indicador de quantum (resaltado solo para Round Robin)
         quantum_val = state.get('quantum', self.quantum)
@@ -204,8 +381,62 @@ class Renderer:
         
         is_rr = current_algo in algo_map['RR'] or current_algo == 'RR'
         quantum_color = COLORS['warning'] if is_rr else COLORS['text_dim']
-        quantum_text = self.font_small.render(f"Q={quantum_val}", True, quantum_color)
-        self.screen.blit(quantum_text, (x + 10, y_start + 5))
+        quantum_text = self._text(self.font_small, self._fmt("Q={}", quantum_val), quantum_color)
+        self._blits.append((quantum_text, (x + 10, y_start + 5)))
+    
+    def _rounded_rect(self, size: Tuple[int, int], color: Tuple[int, int, int],
+                      radius: int, border: Optional[Tuple[int, int, int]] = None) -> pygame.Surface:
+        """
+        Retorna un rectangulo redondeado ya dibujado, creandolo la primera vez.
+        
+        draw.rect con border_radius es la primitiva mas cara que se usa;
+        los rectangulos que se repiten (bloque CPU, cola Ready, fondo del
+        Gantt, rellenos de las barras de progreso) se dibujan una vez por
+        (tamano, color) en un Surface con alpha y luego solo se copian. Se copian directo a la pantalla (no
+        en _blits) porque otras figuras se dibujan encima.
+        
+        Args:
+            size:   (ancho, alto)
+            color:  Color de relleno
+            radius: Radio de las esquinas
+            border: Color del borde de 2px, o None para no dibujarlo
+        """
+        key = (size, color, radius, border)
+        surface = self._rect_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            rect = surface.get_rect()
+            pygame.draw.rect(surface, color, rect, border_radius=radius)
+            if border is not None:
+                pygame.draw.rect(surface, border, rect, 2, border_radius=radius)
+            self._rect_cache[key] = surface
+        return surface
+    
+    def _build_button(self, label: str, is_selected: bool) -> pygame.Surface:
+        """
+        Dibuja un boton de algoritmo en su propio Surface.
+        
+        Solo hay 8 variantes (4 algoritmos x seleccionado o no), asi que
+        _render_algorithm_selector las guarda en _button_cache y cada
+        frame solo las copia a la pantalla.
+        """
+        button = pygame.Surface((_BUTTON_WIDTH, _BUTTON_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        rect = button.get_rect()
+        
+        if is_selected:
+            # Boton activo: fondo de color accent
+            pygame.draw.rect(button, COLORS['accent'], rect, border_radius=4)
+            text_color = COLORS['background']
+        else:
+            # Boton inactivo: fondo panel con borde
+            pygame.draw.rect(button, COLORS['panel'], rect, border_radius=4)
+            pygame.draw.rect(button, COLORS['grid'], rect, 1, border_radius=4)
+            text_color = COLORS['text']
+        
+        # Texto: "N:ALGO"
+        text = self._text(self.font_small, label, text_color)
+        button.blit(text, text.get_rect(center=rect.center))
+        return button
     
     def _render_process_table(self, state: dict):
         """
@@ -221,86 +452,100 @@ class Renderer:
         - Restante: tiempo de CPU restante
         - Estado: NEW/READY/RUNNING/COMPLETED
         """
-        y_start = 115
-        table_height = 180
-        table_width = 420
-        
-        # Panel contenedor
-        panel_rect = pygame.Rect(20, y_start, table_width, table_height)
-        pygame.draw.rect(self.screen, COLORS['panel'], panel_rect, border_radius=8)
-        
-        # Titulo de la tabla
-        title = self.font_medium.render("Procesos", True, COLORS['text'])
-        self.screen.blit(title, (30, y_start + 8))
-        
-        # Encabezados de columnas
-        headers = ['', 'PID', 'Nombre', 'Burst', 'Lleg', 'Pri', 'Rest', 'Estado']
-        header_widths = [12, 35, 65, 45, 40, 35, 40, 70]
-        x = 30
-        y = y_start + 35
-        
-        for header, width in zip(headers, header_widths):
-            text = self.font_tiny.render(header, True, COLORS['text_dim'])
-            self.screen.blit(text, (x, y))
-            x += width
-        
-        # Linea separadora
-        pygame.draw.line(self.screen, COLORS['grid'], (25, y + 15), (table_width + 15, y + 15), 1)
-        
-        # Filas de procesos
+        # Panel, titulo y encabezados estan en el fondo estatico. Las
+        # filas se dibujan en _table_surface y solo se redibujan las que
+        # cambiaron desde el frame anterior
+        table = self._table_surface
+        row_keys = self._table_row_keys
         processes = state.get('processes', [])
-        y += 20
-        max_visible = 6
+        max_visible = _TABLE_MAX_ROWS
         
-        for i, proc in enumerate(processes[:max_visible]):
-            x = 30
-            color_idx = proc.get('color_index', i) % len(PROCESS_COLORS)
-            proc_color = PROCESS_COLORS[color_idx]
-            
-            # Indicador circular de color
-            pygame.draw.circle(self.screen, proc_color, (x + 5, y + 7), 4)
-            x += 12
-            
-            # Preparar valores (truncar nombre y estado si necesario)
-            name = proc.get('name', '')[:6]
-            proc_state = proc.get('state', '')
-            state_short = proc_state[:7] if len(proc_state) > 7 else proc_state
-            
-            values = [
-                str(proc.get('pid', '')),
-                name,
-                str(proc.get('burst_time', '')),
-                str(proc.get('arrival_time', '')),
-                str(proc.get('priority', '')),
-                str(proc.get('remaining_time', '')),
-                state_short
-            ]
-            
-            # Renderizar cada columna
-            for j, (val, width) in enumerate(zip(values, header_widths[1:])):
-                if j == 6:  # Columna de estado tiene colores especiales
-                    state_colors = {
-                        'RUNNING': COLORS['running'],
-                        'READY': COLORS['ready'],
-                        'COMPLET': COLORS['completed'],
-                        'COMPLETED': COLORS['completed'],
-                        'NEW': COLORS['new'],
-                        'WAITING': COLORS['waiting']
-                    }
-                    text_color = state_colors.get(val, state_colors.get(proc_state, COLORS['text']))
-                else:
-                    text_color = COLORS['text']
+        for i in range(max_visible):
+            if i < len(processes):
+                proc = processes[i]
+                color_idx = proc.get('color_index', i) % len(PROCESS_COLORS)
+                
+                # Preparar valores (truncar nombre y estado si necesario)
+                name = proc.get('name', '')[:6]
+                proc_state = proc.get('state', '')
+                state_short = proc_state[:7] if len(proc_state) > 7 else proc_state
                 
-                text = self.font_tiny.render(val, True, text_color)
-                self.screen.blit(text, (x, y))
-                x += width
+                key = (
+                    color_idx,
+                    proc_state,
+                    str(proc.get('pid', '')),
+                    name,
+                    str(proc.get('burst_time', '')),
+                    str(proc.get('arrival_time', '')),
+                    str(proc.get('priority', '')),
+                    str(proc.get('remaining_time', '')),
+                    state_short
+                )
+            else:
+                key = None
             
-            y += 22
+            if key != row_keys[i]:
+                row_keys[i] = key
+                self._draw_table_row(table, i * _TABLE_ROW_HEIGHT, key)
+        
+        # Indicador de procesos adicionales (ultima franja de la superficie)
+        extra = len(processes) - max_visible
+        key = extra if extra > 0 else None
+        if key != row_keys[max_visible]:
+            row_keys[max_visible] = key
+            y = max_visible * _TABLE_ROW_HEIGHT
+            self._restore_table_strip(table, y, table.get_height() - y)
+            if key is not None:
+                more_text = self._text(self.font_tiny, self._fmt("+{} mas...", extra), COLORS['text_dim'])
+                table.blit(more_text, (10, y))
+        
+        self._blits.append((table, _TABLE_ROWS_POS))
+    
+    def _restore_table_strip(self, table: pygame.Surface, y: int, height: int):
+        """Borra una franja de _table_surface copiando el fondo estatico."""
+        x0, y0 = _TABLE_ROWS_POS
+        table.blit(self._static_bg, (0, y), (x0, y0 + y, table.get_width(), height))
+    
+    def _draw_table_row(self, table: pygame.Surface, y: int, row: Optional[tuple]):
+        """
+        Redibuja una fila de la tabla de procesos en _table_surface.
         
-        # Indicador de procesos adicionales
-        if len(processes) > max_visible:
-            more_text = self.font_tiny.render(f"+{len(processes) - max_visible} mas...", True, COLORS['text_dim'])
-            self.screen.blit(more_text, (30, y))
+        Args:
+            table: Superficie de las filas de la tabla
+            y:     Posicion vertical de la fila dentro de table
+            row:   Valores de la fila (ver _render_process_table), o None
+                   para dejarla vacia
+        """
+        self._restore_table_strip(table, y, _TABLE_ROW_HEIGHT)
+        if row is None:
+            return
+        
+        color_idx, proc_state = row[0], row[1]
+        values = row[2:]
+        
+        # Indicador circular de color
+        x = 10
+        pygame.draw.circle(table, PROCESS_COLORS[color_idx], (x + 5, y + 7), 4)
+        x += 12
+        
+        # Renderizar cada columna
+        for j, (val, width) in enumerate(zip(values, _TABLE_COLUMN_WIDTHS[1:])):
+            if j == 6:  # Columna de estado tiene colores especiales
+                state_colors = {
+                    'RUNNING': COLORS['running'],
+                    'READY': COLORS['ready'],
+                    'COMPLET': COLORS['completed'],
+                    'COMPLETED': COLORS['completed'],
+                    'NEW': COLORS['new'],
+                    'WAITING': COLORS['waiting']
+                }
+                text_color = state_colors.get(val, state_colors.get(proc_state, COLORS['text']))
+            else:
+                text_color = COLORS['text']
+            
+            text = self._text(self.font_tiny, val, text_color)
+            table.blit(text, (x, y))
+            x += width
     
     def _render_gantt_chart(self, state: dict):
         """
@@ -316,23 +561,15 @@ class Renderer:
         """
         y_start = 115
         chart_width = 720
-        chart_height = 180
         chart_x_start = 460
         
-        # Panel contenedor
-        panel_rect = pygame.Rect(chart_x_start, y_start, chart_width, chart_height)
-        pygame.draw.rect(self.screen, COLORS['panel'], panel_rect, border_radius=8)
-        
-        # Titulo
-        title = self.font_medium.render("Gantt Chart", True, COLORS['text'])
-        self.screen.blit(title, (chart_x_start + 10, y_start + 8))
-        
+        # Panel y titulo estan en el fondo estatico
         gantt = state.get('gantt_chart', [])
         
         # Mensaje si no hay datos
         if not gantt:
-            no_data = self.font_small.render("Agrega procesos e inicia la simulacion", True, COLORS['text_dim'])
-            self.screen.blit(no_data, (chart_x_start + 180, y_start + 90))
+            no_data = self._text(self.font_small, "Agrega procesos e inicia la simulacion", COLORS['text_dim'])
+            self._blits.append((no_data, (chart_x_start + 180, y_start + 90)))
             return
         
         # Dimensiones del area de grafico
@@ -341,8 +578,9 @@ class Renderer:
         chart_w = chart_width - 40
         chart_h = 80
         
-        # Calcular escala de tiempo
-        max_time = max(end for _, _, end in gantt)
+        # Calcular escala de tiempo (las entradas van en orden de tiempo,
+        # asi que la ultima tiene el mayor end_time)
+        max_time = gantt[-1][2]
         if max_time == 0:
             max_time = 1
         
@@ -352,57 +590,83 @@ class Renderer:
         scale = chart_w / visible_time
         
         # Fondo del area de grafico
-        pygame.draw.rect(self.screen, COLORS['background'], 
-                        (chart_x, chart_y, chart_w, chart_h), border_radius=4)
-        
-        # Mapeo PID -> proceso para obtener colores
-        processes = {p['pid']: p for p in state.get('processes', [])}
-        
-        # Renderizar barras de ejecucion
-        for pid, start, end in gantt:
-            # Convertir a coordenadas visibles
-            vis_start = max(0, start - time_offset)
-            vis_end = max(0, end - time_offset)
-            
-            if vis_end <= 0:
-                continue
-            
-            x = chart_x + vis_start * scale
-            w = (vis_end - vis_start) * scale
-            
-            # Determinar color y etiqueta
-            if pid == -1:
-                # CPU idle
-                color = COLORS['grid']
-                label = "-"
-            else:
-                proc = processes.get(pid, {})
-                color_idx = proc.get('color_index', pid % len(PROCESS_COLORS))
-                color = PROCESS_COLORS[color_idx]
-                label = f"P{pid}"
+        chart_bg = self._rounded_rect((chart_w, chart_h), COLORS['background'], 4)
+        self.screen.blit(chart_bg, (chart_x, chart_y))
+        
+        # Mapeo PID -> color (ver _update_pid_colors)
+        pid_colors = self._pid_colors
+        
+        # Constantes de las barras, fuera del loop
+        bar_y = chart_y + 10
+        bar_h = chart_h - 20
+        bar_cy = bar_y + bar_h // 2
+        label_color = COLORS['background']
+        idle_color = COLORS['grid']
+        label_surfaces = self._gantt_labels
+        
+        # Referencias locales para el loop de barras, el mas largo del frame
+        screen = self.screen
+        draw_rect = pygame.draw.rect
+        queue_blit = self._blits.append
+        
+        # Las barras y marcas son solo figuras (los textos van a _blits):
+        # se dibujan con la pantalla bloqueada una sola vez, en lugar de que
+        # cada llamada a draw la bloquee y desbloquee
+        self.screen.lock()
+        try:
+            # Renderizar barras de ejecucion, desde el primer segmento que
+            # termina dentro de la ventana visible
+            # Las entradas van en orden de tiempo (end creciente): los
+            # segmentos antes de first terminan antes de la ventana
+            first = bisect_right(gantt, time_offset, key=_SEGMENT_END)
+            for pid, start, end in gantt[first:]:
+                # Convertir a coordenadas visibles, recortando el segmento
+                # que empieza antes de la ventana
+                vis_start = start - time_offset if start > time_offset else 0
+                vis_end = end - time_offset
+                
+                x = chart_x + vis_start * scale
+                w = (vis_end - vis_start) * scale
+                
+                # Determinar color (pid -1 es CPU idle)
+                if pid == -1:
+                    color = idle_color
+                else:
+                    color = pid_colors.get(pid)
+                    if color is None:
+                        color = PROCESS_COLORS[pid % len(PROCESS_COLORS)]
+                
+                # Dibujar barra (x >= chart_x, asi que int() es floor, igual
+                # que la conversion que haria pygame.Rect)
+                bar_x = int(x + 1)
+                bar_w = int(max(w - 2, 2))
+                draw_rect(screen, color, (bar_x, bar_y, bar_w, bar_h), border_radius=2)
+                
+                # Etiqueta centrada en la barra si hay espacio suficiente
+                if w > 20:
+                    label_text = label_surfaces.get(pid)
+                    if label_text is None:
+                        label = "-" if pid == -1 else f"P{pid}"
+                        label_text = self._text(self.font_tiny, label, label_color)
+                        label_surfaces[pid] = label_text
+                    label_w, label_h = label_text.get_size()
+                    queue_blit((label_text, (bar_x + bar_w // 2 - label_w // 2,
+                                             bar_cy - label_h // 2)))
             
-            # Dibujar barra
-            bar_rect = pygame.Rect(x + 1, chart_y + 10, max(w - 2, 2), chart_h - 20)
-            pygame.draw.rect(self.screen, color, bar_rect, border_radius=2)
+            # Linea de tiempo
+            timeline_y = chart_y + chart_h + 5
+            pygame.draw.line(self.screen, COLORS['text_dim'], 
+                            (chart_x, timeline_y), (chart_x + chart_w, timeline_y), 1)
             
-            # Etiqueta si hay espacio suficiente
-            if w > 20:
-                label_text = self.font_tiny.render(label, True, COLORS['background'])
-                label_rect = label_text.get_rect(center=bar_rect.center)
-                self.screen.blit(label_text, label_rect)
-        
-        # Linea de tiempo
-        timeline_y = chart_y + chart_h + 5
-        pygame.draw.line(self.screen, COLORS['text_dim'], 
-                        (chart_x, timeline_y), (chart_x + chart_w, timeline_y), 1)
-        
-        # Marcas de tiempo
-        step = max(1, visible_time // 10)
-        for t in range(0, visible_time + 1, step):
-            x = chart_x + t * scale
-            pygame.draw.line(self.screen, COLORS['text_dim'], (x, timeline_y), (x, timeline_y + 5), 1)
-            time_label = self.font_tiny.render(str(t + time_offset), True, COLORS['text_dim'])
-            self.screen.blit(time_label, (x - 5, timeline_y + 8))
+            # Marcas de tiempo
+            step = max(1, visible_time // 10)
+            for t in range(0, visible_time + 1, step):
+                x = chart_x + t * scale
+                pygame.draw.line(self.screen, COLORS['text_dim'], (x, timeline_y), (x, timeline_y + 5), 1)
+                time_label = self._tick_label(t + time_offset)
+                self._blits.append((time_label, (x - 5, timeline_y + 8)))
+        finally:
+            self.screen.unlock()
     
     def _render_cpu_visualization(self, state: dict):
         """
@@ -414,15 +678,8 @@ class Renderer:
         - Ready Queue: procesos esperando
         """
         y_start = 310
-        panel_height = 170
-        
-        # Panel contenedor
-        panel_rect = pygame.Rect(20, y_start, 420, panel_height)
-        pygame.draw.rect(self.screen, COLORS['panel'], panel_rect, border_radius=8)
         
-        # Titulo
-        title = self.font_medium.render("CPU", True, COLORS['text'])
-        self.screen.blit(title, (30, y_start + 8))
+        # Panel, titulo y etiqueta de la cola estan en el fondo estatico
         
         # Dimensiones del bloque CPU
         cpu_x = 50
@@ -439,15 +696,13 @@ class Renderer:
             color = PROCESS_COLORS[color_idx]
             
             # Bloque CPU con color del proceso
-            cpu_rect = pygame.Rect(cpu_x, cpu_y, cpu_w, cpu_h)
-            pygame.draw.rect(self.screen, color, cpu_rect, border_radius=8)
-            pygame.draw.rect(self.screen, COLORS['text'], cpu_rect, 2, border_radius=8)
+            block = self._rounded_rect((cpu_w, cpu_h), color, 8, COLORS['text'])
+            self.screen.blit(block, (cpu_x, cpu_y))
             
             # Nombre del proceso
             proc_name = proc.get('name', '')[:10]
-            name_text = self.font_medium.render(f"P{proc.get('pid')}: {proc_name}", True, COLORS['background'])
-            name_rect = name_text.get_rect(center=(cpu_x + cpu_w//2, cpu_y + 25))
-            self.screen.blit(name_text, name_rect)
+            name_text = self._text(self.font_medium, self._fmt("P{}: {}", proc.get('pid'), proc_name), COLORS['background'])
+            self._blits.append((name_text, _centered(name_text, cpu_x + cpu_w//2, cpu_y + 25)))
             
             # Calcular progreso
             remaining = proc.get('remaining_time', 0)
@@ -460,47 +715,50 @@ class Renderer:
             prog_w = cpu_w - 30
             prog_h = 15
             
-            pygame.draw.rect(self.screen, COLORS['background'], (prog_x, prog_y, prog_w, prog_h), border_radius=3)
-            if progress > 0:
-                pygame.draw.rect(self.screen, COLORS['success'], 
-                               (prog_x, prog_y, int(prog_w * progress), prog_h), border_radius=3)
+            prog_bg = self._rounded_rect((prog_w, prog_h), COLORS['background'], 3)
+            self.screen.blit(prog_bg, (prog_x, prog_y))
+            # El relleno solo puede tener prog_w anchos distintos: cada uno
+            # se dibuja una vez y queda en el cache de _rounded_rect
+            fill_w = int(prog_w * progress)
+            if fill_w > 0:
+                prog_fill = self._rounded_rect((fill_w, prog_h), COLORS['success'], 3)
+                self.screen.blit(prog_fill, (prog_x, prog_y))
             
             # Texto de progreso
-            prog_text = self.font_tiny.render(f"{int(progress*100)}% - {remaining}t restante", True, COLORS['background'])
-            prog_rect = prog_text.get_rect(center=(cpu_x + cpu_w//2, cpu_y + 75))
-            self.screen.blit(prog_text, prog_rect)
+            prog_text = self._text(self.font_tiny, self._fmt("{}% - {}t restante", int(progress*100), remaining), COLORS['background'])
+            self._blits.append((prog_text, _centered(prog_text, cpu_x + cpu_w//2, cpu_y + 75)))
             
         else:
             # CPU idle
-            cpu_rect = pygame.Rect(cpu_x, cpu_y, cpu_w, cpu_h)
-            pygame.draw.rect(self.screen, COLORS['grid'], cpu_rect, border_radius=8)
-            pygame.draw.rect(self.screen, COLORS['text_dim'], cpu_rect, 2, border_radius=8)
+            block = self._rounded_rect((cpu_w, cpu_h), COLORS['grid'], 8, COLORS['text_dim'])
+            self.screen.blit(block, (cpu_x, cpu_y))
             
-            idle_text = self.font_medium.render("IDLE", True, COLORS['text_dim'])
-            idle_rect = idle_text.get_rect(center=cpu_rect.center)
-            self.screen.blit(idle_text, idle_rect)
+            idle_text = self._text(self.font_medium, "IDLE", COLORS['text_dim'])
+            self._blits.append((idle_text, _centered(idle_text, cpu_x + cpu_w//2, cpu_y + cpu_h//2)))
         
         # Cola Ready
         ready_x = 260
-        ready_label = self.font_small.render("Ready Queue", True, COLORS['text'])
-        self.screen.blit(ready_label, (ready_x, y_start + 40))
-        
         ready_procs = [p for p in state.get('processes', []) if p.get('state') == 'READY']
         y = y_start + 65
         max_visible = 4
         
+        pid_colors = self._pid_colors
         for proc in ready_procs[:max_visible]:
-            color_idx = proc.get('color_index', 0) % len(PROCESS_COLORS)
-            color = PROCESS_COLORS[color_idx]
+            # El mapeo puede no tener el pid (roster_version repetida tras
+            # reconectar): mismo respaldo que en el Gantt
+            pid = proc.get('pid')
+            color = pid_colors.get(pid)
+            if color is None:
+                color = PROCESS_COLORS[proc.get('color_index', pid) % len(PROCESS_COLORS)]
             
-            pygame.draw.rect(self.screen, color, (ready_x, y, 140, 20), border_radius=3)
-            proc_text = self.font_tiny.render(f"P{proc.get('pid')} - {proc.get('name', '')[:8]}", True, COLORS['background'])
-            self.screen.blit(proc_text, (ready_x + 8, y + 3))
+            self.screen.blit(self._rounded_rect((140, 20), color, 3), (ready_x, y))
+            proc_text = self._text(self.font_tiny, self._fmt("P{} - {}", proc.get('pid'), proc.get('name', '')[:8]), COLORS['background'])
+            self._blits.append((proc_text, (ready_x + 8, y + 3)))
             y += 25
         
         if len(ready_procs) > max_visible:
-            more = self.font_tiny.render(f"+{len(ready_procs)-max_visible}", True, COLORS['text_dim'])
-            self.screen.blit(more, (ready_x, y))
+            more = self._text(self.font_tiny, self._fmt("+{}", len(ready_procs)-max_visible), COLORS['text_dim'])
+            self._blits.append((more, (ready_x, y)))
     
     def _render_statistics(self, state: dict):
         """
@@ -516,57 +774,50 @@ class Renderer:
         - Completados: N/M procesos terminados
         """
         y_start = 310
-        panel_height = 170
         panel_x = 460
         
-        # Panel contenedor
-        panel_rect = pygame.Rect(panel_x, y_start, 720, panel_height)
-        pygame.draw.rect(self.screen, COLORS['panel'], panel_rect, border_radius=8)
-        
-        # Titulo
-        title = self.font_medium.render("Estadisticas", True, COLORS['text'])
-        self.screen.blit(title, (panel_x + 10, y_start + 8))
+        # Panel, titulo y fondo de la barra de CPU estan en el fondo estatico
         
         stats = state.get('statistics', {})
         
         # Metricas en 2 columnas
         col1_metrics = [
-            ("Avg Wait Time", f"{stats.get('avg_waiting_time', 0):.2f}"),
-            ("Avg Turnaround", f"{stats.get('avg_turnaround_time', 0):.2f}"),
-            ("Avg Response", f"{stats.get('avg_response_time', 0):.2f}"),
+            ("Avg Wait Time", self._fmt("{:.2f}", stats.get('avg_waiting_time', 0))),
+            ("Avg Turnaround", self._fmt("{:.2f}", stats.get('avg_turnaround_time', 0))),
+            ("Avg Response", self._fmt("{:.2f}", stats.get('avg_response_time', 0))),
         ]
         
         col2_metrics = [
-            ("Throughput", f"{stats.get('throughput', 0):.3f}"),
-            ("CPU Usage", f"{stats.get('cpu_utilization', 0):.1f}%"),
-            ("Ctx Switches", f"{state.get('context_switches', 0)}"),
+            ("Throughput", self._fmt("{:.3f}", stats.get('throughput', 0))),
+            ("CPU Usage", self._fmt("{:.1f}%", stats.get('cpu_utilization', 0))),
+            ("Ctx Switches", self._fmt("{}", state.get('context_switches', 0))),
         ]
         
         # Columna 1
         x1 = panel_x + 20
         y = y_start + 40
         for label, value in col1_metrics:
-            label_text = self.font_small.render(label, True, COLORS['text_dim'])
-            self.screen.blit(label_text, (x1, y))
-            value_text = self.font_small.render(value, True, COLORS['accent'])
-            self.screen.blit(value_text, (x1 + 120, y))
+            label_text = self._text(self.font_small, label, COLORS['text_dim'])
+            self._blits.append((label_text, (x1, y)))
+            value_text = self._text(self.font_small, value, COLORS['accent'])
+            self._blits.append((value_text, (x1 + 120, y)))
             y += 28
         
         # Columna 2
         x2 = panel_x + 260
         y = y_start + 40
         for label, value in col2_metrics:
-            label_text = self.font_small.render(label, True, COLORS['text_dim'])
-            self.screen.blit(label_text, (x2, y))
-            value_text = self.font_small.render(value, True, COLORS['accent'])
-            self.screen.blit(value_text, (x2 + 100, y))
+            label_text = self._text(self.font_small, label, COLORS['text_dim'])
+            self._blits.append((label_text, (x2, y)))
+            value_text = self._text(self.font_small, value, COLORS['accent'])
+            self._blits.append((value_text, (x2 + 100, y)))
             y += 28
         
         # Contador de completados
         completed = stats.get('completed_count', 0)
         total = stats.get('total_count', 0)
-        comp_text = self.font_small.render(f"Completados: {completed}/{total}", True, COLORS['success'])
-        self.screen.blit(comp_text, (x2, y + 10))
+        comp_text = self._text(self.font_small, self._fmt("Completados: {}/{}", completed, total), COLORS['success'])
+        self._blits.append((comp_text, (x2, y + 10)))
         
         # Barra vertical de CPU
         bar_x = panel_x + 500
@@ -576,43 +827,43 @@ class Renderer:
         
         cpu_util = stats.get('cpu_utilization', 0)
         
-        # Fondo de la barra
-        pygame.draw.rect(self.screen, COLORS['background'], (bar_x, bar_y, bar_w, bar_h), border_radius=5)
-        
         # Relleno segun utilizacion
         fill_h = int(bar_h * cpu_util / 100)
         if fill_h > 0:
-            pygame.draw.rect(self.screen, COLORS['success'], 
-                           (bar_x, bar_y + bar_h - fill_h, bar_w, fill_h), border_radius=5)
+            bar_fill = self._rounded_rect((bar_w, fill_h), COLORS['success'], 5)
+            self.screen.blit(bar_fill, (bar_x, bar_y + bar_h - fill_h))
         
         # Etiqueta centrada
-        cpu_label = self.font_small.render("CPU", True, COLORS['text'])
-        cpu_label_rect = cpu_label.get_rect(center=(bar_x + bar_w//2, bar_y + bar_h//2 - 10))
-        self.screen.blit(cpu_label, cpu_label_rect)
+        cpu_label = self._text(self.font_small, "CPU", COLORS['text'])
+        self._blits.append((cpu_label, _centered(cpu_label, bar_x + bar_w//2, bar_y + bar_h//2 - 10)))
         
-        cpu_val = self.font_medium.render(f"{cpu_util:.0f}%", True, COLORS['text'])
-        cpu_val_rect = cpu_val.get_rect(center=(bar_x + bar_w//2, bar_y + bar_h//2 + 12))
-        self.screen.blit(cpu_val, cpu_val_rect)
+        cpu_val = self._text(self.font_medium, self._fmt("{:.0f}%", cpu_util), COLORS['text'])
+        self._blits.append((cpu_val, _centered(cpu_val, bar_x + bar_w//2, bar_y + bar_h//2 + 12)))
     
-    def _render_controls_help(self):
-        """Renderiza la barra de ayuda de controles."""
-        y = self.height - 45
+    def wait_events(self, timeout_ms: int) -> List[pygame.event.Event]:
+        """
+        Bloquea hasta que haya un evento o pase timeout_ms.
         
-        # Panel de fondo
-        help_rect = pygame.Rect(20, y, self.width - 40, 35)
-        pygame.draw.rect(self.screen, COLORS['panel'], help_rect, border_radius=6)
+        Retorna el primer evento junto con los que esten pendientes, o una
+        lista vacia si se agoto el tiempo.
+        Con timeout_ms=0 espera sin limite.
         
-        # Texto de controles
-        controls = "[1-4] Algoritmo    [SPACE] Play/Pause    [A] Agregar    [R] Reset    [+/-] Quantum    [Q] Salir"
-        
-        text = self.font_small.render(controls, True, COLORS['text_dim'])
-        text_rect = text.get_rect(center=help_rect.center)
-        self.screen.blit(text, text_rect)
-    
-    def get_events(self) -> List[pygame.event.Event]:
-        """Retorna la lista de eventos de PyGame pendientes."""
-        return pygame.event.get()
+        Solo llegan a la cola los tipos permitidos con set_allowed (ver
+        __init__), asi que no hace falta filtrar aqui. wait() ya bombeo
+        los eventos de SDL, por eso el get() siguiente usa pump=False.
+        """
+        event = pygame.event.wait(timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        events = pygame.event.get(pump=False)
+        events.insert(0, event)
+        return events
     
     def quit(self):
         """Cierra PyGame y libera recursos."""
+        self._text_cache.clear()
+        self._button_cache.clear()
+        self._rect_cache.clear()
+        self._fmt_cache.clear()
+        self._gantt_labels.clear()
         pygame.quit()